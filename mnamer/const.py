@@ -51,20 +51,41 @@ CACHE_PATH = Path(
     cache_dir, f"mnamer-py{version_info.major}.{version_info.minor}"
 ).absolute()
 
+PARSE_CACHE_PATH = Path(f"{CACHE_PATH}-parse.sqlite")
+
+SCAN_INDEX_PATH = Path(f"{CACHE_PATH}-index.sqlite")
+
 CURRENT_YEAR = dt.datetime.now().year
 
 DEPRECATED = {"no_replace", "replacements"}
 
+# what the values of format fields look like when read back from file paths;
+# other fields may contain anything
+FORMAT_FIELD_PATTERNS = {
+    "date": r"\d{4}-\d{2}-\d{2}",
+    "episode": r"\d+",
+    "episode_last": r"\d+",
+    "episode_range": r"\d+(?:-\d+)?",
+    "season": r"\d+",
+    "year": r"\d{4}",
+}
+
 IS_DEBUG = gettrace() is not None
 
+PARTIAL_CONTAINERS = [".!qb", ".!ut", ".crdownload", ".part", ".partial"]
+
 SUBTITLE_CONTAINERS = [".srt", ".idx", ".sub"]
 
+VIDEO_CONTAINERS = [".avi", ".m4v", ".mp4", ".mkv", ".ts", ".wmv"]
+
 
 SYSTEM = {
     "date": dt.date.today(),
     "platform": platform(),
     "arguments": argv[1:],
     "cache location": f"{CACHE_PATH}.sqlite",
+    "parse cache location": str(PARSE_CACHE_PATH),
+    "scan index location": str(SCAN_INDEX_PATH),
     "python version": python_version(),
     "mnamer version": VERSION,
     "appdirs version": appdirs_version,
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from itertools import chain
+from pathlib import Path
 
 from mnamer import tty
 from mnamer.const import SYSTEM, USAGE, VERSION
@@ -9,21 +12,49 @@ from mnamer.exceptions import (
     MnamerNotFoundException,
     MnamerSkipException,
 )
+from mnamer.parse_cache import ParseCache
+from mnamer.parsing import clear_siblings, fast_path_counts
+from mnamer.scan_index import ScanIndex
 from mnamer.setting_store import SettingStore
+from mnamer.stat_cache import get_stat_cache
 from mnamer.target import Target
-from mnamer.types import MessageType
-from mnamer.utils import clear_cache, get_filesize, is_subtitle
+from mnamer.types import MessageType, ScanOutcome
+from mnamer.utils import clear_cache, compile_blacklist, get_filesize, is_subtitle
+from mnamer.watcher import Watcher
 
 
 class Frontend(ABC):
     settings: SettingStore
-    targets: list[Target]
+    parse_cache: ParseCache | None
+    scan_index: ScanIndex | None
+    watcher: Watcher | None
+    targets: list[Target] | Iterator[Target]
 
     def __init__(self, settings: SettingStore):
         self.settings = settings
-        self.targets = Target.populate_paths(self.settings)
+        get_stat_cache().clear()
+        fast_path_counts.clear()
+        clear_siblings()
+        self.parse_cache = None if settings.no_cache else ParseCache()
+        if settings.incremental:
+            self.scan_index = ScanIndex()
+        elif settings.watch:
+            # remembers files handled this session so that rescans skip them
+            self.scan_index = ScanIndex(":memory:")
+        else:
+            self.scan_index = None
         tty.configure(self.settings)
         self._handle_directives()
+        # watch from the start so that files written meanwhile aren't missed
+        self.watcher = self._open_watcher() if settings.watch else None
+        if settings.stream:
+            self.targets = Target.iter_paths(
+                self.settings, self.scan_index, parse_cache=self.parse_cache
+            )
+        else:
+            self.targets = Target.populate_paths(
+                self.settings, self.scan_index, parse_cache=self.parse_cache
+            )
         self._print_configuration()
 
     def _handle_directives(self) -> None:
@@ -37,6 +68,8 @@ class Frontend(ABC):
 
         if self.settings.clear_cache:
             clear_cache()
+            (self.parse_cache or ParseCache()).clear()
+            ScanIndex().clear()
             tty.msg("cache cleared", MessageType.ALERT)
             raise SystemExit(0)
 
@@ -47,13 +80,26 @@ class Frontend(ABC):
                 f"loaded config from '{self.settings.config_path}'", MessageType.ALERT
             )
 
+    def _open_watcher(self) -> Watcher:
+        try:
+            return Watcher(
+                self.settings.targets,
+                self.settings.recurse,
+                compile_blacklist(self.settings.ignore),
+            )
+        except MnamerException as e:
+            tty.error(e)
+            raise SystemExit(2) from None
+
     def _print_configuration(self) -> None:
         tty.msg("\nsystem", debug=True)
         tty.msg(SYSTEM, debug=True)
         tty.msg("\nsettings", debug=True)
         tty.msg(self.settings.as_dict(), debug=True)
         tty.msg("\ntargets", debug=True)
-        if self.targets:
+        if isinstance(self.targets, Iterator):
+            tty.msg("(streamed as they are found)", debug=True)
+        elif self.targets:
             tty.msg(self.targets, debug=True)
         else:
             tty.msg([None], debug=True)
@@ -70,85 +116,151 @@ class Cli(Frontend):
             tty.error(USAGE)
             raise SystemExit(2)
         self.success_count = 0
+        self.streamed_count = 0
+        self.destinations: set[Path] = set()  # files moved or renamed by mnamer
 
     @property
     def total_count(self):
+        if isinstance(self.targets, Iterator):
+            return self.streamed_count
         return len(self.targets)
 
     def launch(self) -> None:
         tty.msg("Starting mnamer", MessageType.HEADING)
         self._ensure_targets()
-        self._process_targets()
-        self._report_results()
+        try:
+            if self.targets:
+                self._process_targets()
+                self._report_results()
+            if self.settings.watch:
+                self._watch_targets()
+        finally:
+            if self.watcher:
+                self.watcher.close()
+            if self.parse_cache:
+                self.parse_cache.close()
+            if self.scan_index:
+                self.scan_index.close()
 
     def _ensure_targets(self) -> None:
-        if not self.targets:
+        if isinstance(self.targets, Iterator):
+            first = next(self.targets, None)
+            self.targets = chain([first], self.targets) if first else []
+        if not self.targets and not self.settings.watch:
             tty.msg("", debug=True)
             tty.msg("no media files found", MessageType.ALERT)
             raise SystemExit(0)
 
     def _process_targets(self) -> None:
         for target in self.targets:
-            self._announce_file(target)
-            self._list_details(target)
-
-            # find match for target
-            matches = []
-            try:
-                matches = target.query()
-            except MnamerNotFoundException:
-                tty.msg("no matches found", MessageType.ALERT)
-            except MnamerNetworkException:
-                tty.msg("network error", MessageType.ALERT)
-            if not matches and self.settings.no_guess:
-                tty.msg("skipping (--no-guess)", MessageType.ALERT)
+            # streamed crawls may reach files after they have been moved
+            if self.settings.stream and target.source.resolve() in self.destinations:
                 continue
+            self.streamed_count += 1
+            if not self._process_target(target):
+                break
+
+    def _process_target(self, target: Target) -> bool:
+        """Processes a single target, returning False if the user aborted."""
+        self._announce_file(target)
+        self._list_details(target)
+
+        if self.settings.skip_organized and target.is_organized():
+            tty.msg("skipping (already organized)", MessageType.ALERT)
+            self._record_outcome(target, ScanOutcome.SKIPPED)
+            return True
+
+        # find match for target
+        matches = []
+        not_found = False
+        try:
+            matches = target.query()
+        except MnamerNotFoundException:
+            tty.msg("no matches found", MessageType.ALERT)
+            not_found = True
+        except MnamerNetworkException:
+            tty.msg("network error", MessageType.ALERT)
+        if not matches and self.settings.no_guess:
+            tty.msg("skipping (--no-guess)", MessageType.ALERT)
+            if not_found:
+                self._record_outcome(target, ScanOutcome.NOT_FOUND)
+            return True
+        try:
+            if self.settings.batch:
+                match = matches[0] if matches else target.metadata
+            elif not matches:
+                match = tty.metadata_guess(target.metadata)
+            else:
+                match = tty.metadata_prompt(matches)
+        except MnamerSkipException:
+            tty.msg("skipping (user request)", MessageType.ALERT)
+            self._record_outcome(target, ScanOutcome.SKIPPED)
+            return True
+        except MnamerAbortException:
+            tty.msg("aborting (user request)", MessageType.ERROR)
+            return False
+        target.metadata.update(match)
+
+        if is_subtitle(target.metadata.container) and not target.metadata.language_sub:
+            if self.settings.batch:
+                tty.msg(
+                    "skipping (subtitle language can't be detected)",
+                    MessageType.ALERT,
+                )
+                self._record_outcome(target, ScanOutcome.SKIPPED)
+                return True
             try:
-                if self.settings.batch:
-                    match = matches[0] if matches else target.metadata
-                elif not matches:
-                    match = tty.metadata_guess(target.metadata)
-                else:
-                    match = tty.metadata_prompt(matches)
+                target.metadata.language_sub = tty.subtitle_prompt()
             except MnamerSkipException:
                 tty.msg("skipping (user request)", MessageType.ALERT)
-                continue
+                self._record_outcome(target, ScanOutcome.SKIPPED)
+                return True
             except MnamerAbortException:
                 tty.msg("aborting (user request)", MessageType.ERROR)
-                break
-            target.metadata.update(match)
-
-            if (
-                is_subtitle(target.metadata.container)
-                and not target.metadata.language_sub
-            ):
-                if self.settings.batch:
-                    tty.msg(
-                        "skipping (subtitle language can't be detected)",
-                        MessageType.ALERT,
-                    )
-                    continue
-                try:
-                    target.metadata.language_sub = tty.subtitle_prompt()
-                except MnamerSkipException:
-                    tty.msg("skipping (user request)", MessageType.ALERT)
-                    continue
-                except MnamerAbortException:
-                    tty.msg("aborting (user request)", MessageType.ERROR)
-                    break
+                return False
 
-            # sanity check move
-            if target.destination == target.source:
-                tty.msg(
-                    "skipping (source and destination paths are the same)",
-                    MessageType.ALERT,
-                )
-                continue
-            if self.settings.no_overwrite and target.destination.exists():
-                tty.msg("skipping (--no-overwrite)", MessageType.ALERT)
-                continue
+        # sanity check move
+        if target.destination == target.source:
+            tty.msg(
+                "skipping (source and destination paths are the same)",
+                MessageType.ALERT,
+            )
+            if not self.settings.test:
+                target.store_match()
+            self._record_outcome(target, ScanOutcome.SKIPPED)
+            return True
+        if self.settings.no_overwrite and get_stat_cache().exists(target.destination):
+            tty.msg("skipping (--no-overwrite)", MessageType.ALERT)
+            self._record_outcome(target, ScanOutcome.SKIPPED)
+            return True
 
-            self._rename_and_move_file(target)
+        self._rename_and_move_file(target)
+        return True
+
+    def _watch_targets(self) -> None:
+        assert self.watcher
+        tty.msg("\nWatching for new files", MessageType.HEADING)
+        try:
+            for file_path in self.watcher:
+                # files renamed in place are reported as moved in
+                if file_path.resolve() in self.destinations:
+                    self.destinations.discard(file_path.resolve())
+                    continue
+                # files and episode lists may change while watching
+                get_stat_cache().clear()
+                clear_siblings()
+                Target.clear_provider_memos()
+                targets = Target.populate_paths(
+                    self.settings, self.scan_index, [file_path], self.parse_cache
+                )
+                if targets and not self._process_target(targets[0]):
+                    break
+                if self.parse_cache:
+                    self.parse_cache.commit()
+                if self.scan_index:
+                    self.scan_index.commit()
+        except KeyboardInterrupt:
+            tty.msg("\nstopped watching", MessageType.ALERT)
 
     def _announce_file(self, target: Target):
         media_type = target.metadata.to_media_type().value.title()
@@ -186,6 +298,16 @@ class Cli(Frontend):
         else:
             tty.msg("OK!", MessageType.SUCCESS)
             self.success_count += 1
+            self.destinations.add(target.destination.resolve())
+            self._record_outcome(target, ScanOutcome.MOVED)
+
+    def _record_outcome(self, target: Target, outcome: ScanOutcome):
+        if not self.scan_index or self.settings.test:
+            return
+        if outcome is ScanOutcome.MOVED:
+            self.scan_index.record(target.destination.resolve(), outcome)
+        else:
+            self.scan_index.record(target.source, outcome)
 
     def _report_results(self) -> None:
         if self.success_count == 0:
@@ -198,6 +320,12 @@ class Cli(Frontend):
             f"\n{self.success_count} out of {self.total_count} files processed successfully",
             message_type,
         )
+        if fast_path_counts.total():
+            tty.msg(
+                f"{fast_path_counts['hit']} out of {fast_path_counts.total()} "
+                "filenames parsed using the fast path",
+                debug=True,
+            )
 
 
 class Gui(Frontend):
@@ -3,9 +3,9 @@ from __future__ import annotations
 import dataclasses
 import datetime as dt
 import re
-from collections.abc import Callable, Mapping, Sequence
-from string import Formatter
-from typing import Any
+from collections.abc import Callable
+from functools import cache, lru_cache
+from typing import Any, ClassVar
 
 from mnamer.language import Language
 from mnamer.types import MediaType
@@ -21,21 +21,58 @@ from mnamer.utils import (
 )
 
 
-class _MetaFormatter(Formatter):
-    def format_field(self, value: None | int | str, format_spec: str) -> str:
-        return format(value, format_spec) if value is not None else ""
+class _FormatTemplate:
+    """
+    A format specification parsed into literal text and fields once, so that
+    it can render any number of Metadata instances without being parsed again.
+    Fields are written as '{key}', '{key[index]}' or '{key:width}'; any other
+    text, including unmatched braces, is rendered as is.
+    """
 
-    def get_value(
-        self, key: str | int, args: Sequence[Any], kwargs: Mapping[str, Any]
-    ) -> None | int | str:
-        if isinstance(key, int):
-            assert args
-            return args[key]
-        else:
-            return kwargs.get(key, "")
+    pattern = re.compile(r"{(\w+)(?:\[([\w:]+)\])?(?::(\d{1,2}))?}")
+    title_case_keys = frozenset({"name", "series", "synopsis", "title"})
+
+    def __init__(self, format_spec: str):
+        self.parts: list[str | tuple[str, int | str | None, str, bool]] = []
+        position = 0
+        for mobj in self.pattern.finditer(format_spec):
+            if mobj.start() > position:
+                self.parts.append(format_spec[position : mobj.start()])
+            key, index, width = mobj.groups()
+            if index and index.isdigit():
+                index = int(index)
+            title_case = key in self.title_case_keys
+            self.parts.append((key, index, width or "", title_case))
+            position = mobj.end()
+        if position < len(format_spec):
+            self.parts.append(format_spec[position:])
+
+    def render(self, metadata: Metadata) -> str:
+        keys = metadata.format_keys()
+        rendered = []
+        for part in self.parts:
+            if isinstance(part, str):
+                rendered.append(part)
+                continue
+            key, index, width, title_case = part
+            # language fields are indexed by key, e.g. '{language[a2]}', and
+            # sequences by position, e.g. '{title[0]}'
+            value: Any = getattr(metadata, key) if key in keys else ""
+            if isinstance(value, Language):
+                value = dataclasses.asdict(value)
+            if index is not None:
+                value = value[index]
+            value = format(value, width) if value is not None else ""
+            rendered.append(str_title_case(value) if title_case else value)
+        return str_fix_padding("".join(rendered))
+
+
+@lru_cache(maxsize=64)
+def _format_template(format_spec: str) -> _FormatTemplate:
+    return _FormatTemplate(format_spec)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Metadata:
     """A dataclass which transforms and stores media metadata information."""
 
@@ -46,6 +83,19 @@ class Metadata:
     quality: str | None = None
     synopsis: str | None = None
 
+    # properties which are rendered and listed alongside the fields
+    derived_keys: ClassVar[tuple[str, ...]] = ("extension",)
+
+    # how values are transformed as they are assigned, built once per class
+    converters: ClassVar[dict[str, Callable[[Any], Any]]] = {
+        "container": normalize_container,
+        "group": str.upper,
+        "language": Language.parse,
+        "language_sub": Language.parse,
+        "quality": str.lower,
+        "synopsis": str.capitalize,
+    }
+
     @classmethod
     def to_media_type(cls) -> MediaType:
         if cls is MetadataEpisode:
@@ -56,19 +106,10 @@ class Metadata:
             raise ValueError(f"Unknown metadata class: {cls}")
 
     def __setattr__(self, key: str, value: Any):
-        converter_map: dict[str, Callable] = {
-            "container": normalize_container,
-            "group": str.upper,
-            "language": Language.parse,
-            "language_sub": Language.parse,
-            "media": MediaType,
-            "quality": str.lower,
-            "synopsis": str.capitalize,
-        }
-        converter: Callable | None = converter_map.get(key)
+        converter = self.converters.get(key)
         if value is not None and converter:
             value = converter(value)
-        super().__setattr__(key, value)
+        object.__setattr__(self, key, value)
 
     def __format__(self, format_spec: str | None):
         raise NotImplementedError
@@ -83,28 +124,29 @@ class Metadata:
         else:
             return self.container
 
+    @classmethod
+    @cache
+    def format_keys(cls) -> frozenset[str]:
+        """The keys which format specifications can refer to."""
+        fields = (field.name for field in dataclasses.fields(cls))
+        return frozenset((*fields, *cls.derived_keys))
+
     def as_dict(self) -> dict[str, Any]:
         d = dataclasses.asdict(self)
-        d["extension"] = self.extension
+        for key in self.derived_keys:
+            d[key] = getattr(self, key)
         return d
 
-    def _format_repl(self, mobj) -> str:
-        format_string, key = mobj.groups()
-        value = _MetaFormatter().vformat(format_string, "", self.as_dict())
-        if key in {"name", "series", "synopsis", "title"}:
-            value = str_title_case(value)
-        return value
-
     def update(self, metadata: Metadata):
         """Overlays all none value from another Metadata instance."""
-        for field in dataclasses.asdict(self).keys():
-            value = getattr(metadata, field)
+        for field in dataclasses.fields(self):
+            value = getattr(metadata, field.name)
             if value is None:
                 continue
-            super().__setattr__(field, value)
+            object.__setattr__(self, field.name, value)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class MetadataMovie(Metadata):
     """
     A dataclass which transforms and stores media metadata information specific
@@ -116,25 +158,17 @@ class MetadataMovie(Metadata):
     id_imdb: str | None = None
     id_tmdb: str | None = None
 
-    def __format__(self, format_spec: str | None):
-        default = "{name} ({year})"
-        re_pattern = r"({(\w+)(?:\[[\w:]+\])?(?:\:\d{1,2})?})"
-        s = re.sub(re_pattern, self._format_repl, format_spec or default)
-        s = str_fix_padding(s)
-        return s
+    converters: ClassVar[dict[str, Callable[[Any], Any]]] = {
+        **Metadata.converters,
+        "name": fn_pipe(str_replace_slashes, str_title_case),
+        "year": year_parse,
+    }
 
-    def __setattr__(self, key: str, value: Any):
-        converter_map: dict[str, Callable] = {
-            "name": fn_pipe(str_replace_slashes, str_title_case),
-            "year": year_parse,
-        }
-        converter: Callable | None = converter_map.get(key)
-        if value is not None and converter:
-            value = converter(value)
-        super().__setattr__(key, value)
+    def __format__(self, format_spec: str | None):
+        return _format_template(format_spec or "{name} ({year})").render(self)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class MetadataEpisode(Metadata):
     """
     A dataclass which transforms and stores media metadata information specific to
@@ -144,35 +178,44 @@ class MetadataEpisode(Metadata):
     series: str | None = None
     season: int | None = None
     episode: int | None = None
+    episode_last: int | None = None
     date: dt.date | None = None
     title: str | None = None
     id_tvdb: str | None = None
     id_tvmaze: str | None = None
 
+    derived_keys: ClassVar[tuple[str, ...]] = ("extension", "episode_range")
+
+    converters: ClassVar[dict[str, Callable[[Any], Any]]] = {
+        **Metadata.converters,
+        "date": parse_date,
+        "episode": int,
+        "episode_last": int,
+        "season": int,
+        "series": fn_pipe(str_replace_slashes, str_title_case),
+        "title": fn_pipe(str_replace_slashes, str_title_case),
+    }
+
     def __post_init__(self):
         if isinstance(self.season, str):
             self.season = int(self.season)
         if isinstance(self.episode, str):
             self.episode = int(self.episode)
+        if isinstance(self.episode_last, str):
+            self.episode_last = int(self.episode_last)
         if isinstance(self.date, str):
             self.date = parse_date(self.date)
 
     def __format__(self, format_spec: str | None):
         default = "{series} - {season:02}x{episode:02} - {title}"
-        re_pattern = r"({(\w+)(?:\[[\w:]+\])?(?:\:\d{1,2})?})"
-        s = re.sub(re_pattern, self._format_repl, format_spec or default)
-        s = str_fix_padding(s)
-        return s
+        return _format_template(format_spec or default).render(self)
 
-    def __setattr__(self, key: str, value: Any):
-        converter_map: dict[str, Callable] = {
-            "date": parse_date,
-            "episode": int,
-            "season": int,
-            "series": fn_pipe(str_replace_slashes, str_title_case),
-            "title": fn_pipe(str_replace_slashes, str_title_case),
-        }
-        converter: Callable | None = converter_map.get(key)
-        if value is not None and converter:
-            value = converter(value)
-        super().__setattr__(key, value)
+    @property
+    def episode_range(self) -> str | None:
+        """The episode number, or range for multi-episode files, e.g. '01-02'."""
+        if self.episode is None:
+            return None
+        elif self.episode_last is None or self.episode_last <= self.episode:
+            return f"{self.episode:02}"
+        else:
+            return f"{self.episode:02}-{self.episode_last:02}"
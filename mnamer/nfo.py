@@ -0,0 +1,114 @@
+"""Reads provider IDs from Kodi-style .nfo sidecar files."""
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from xml.etree import ElementTree
+
+from mnamer.const import VIDEO_CONTAINERS
+from mnamer.stat_cache import get_stat_cache
+from mnamer.types import MediaType
+
+NFO_SIZE_LIMIT = 1024 * 1024
+
+# the root element of the sidecars which describe each media type
+NFO_ROOTS = {MediaType.EPISODE: "tvshow", MediaType.MOVIE: "movie"}
+
+# provider links which may be used instead of, or alongside, xml
+NFO_URL_PATTERNS = {
+    "id_imdb": re.compile(r"imdb\.com/title/(tt\d+)"),
+    "id_tmdb": re.compile(r"themoviedb\.org/(?:movie|tv)/(\d+)"),
+    "id_tvdb": re.compile(r"thetvdb\.com/.*?(?:series/|[?&]id=)(\d+)"),
+    "id_tvmaze": re.compile(r"tvmaze\.com/shows/(\d+)"),
+}
+
+
+def sidecar_ids(file_path: Path, media: MediaType | None) -> dict[str, str]:
+    """
+    Returns the provider IDs found in the sidecar describing a media file, i.e.
+    '<stem>.nfo' next to movies, or 'movie.nfo' if the movie is the only video
+    in its folder, and 'tvshow.nfo' in the folder of episodes or in the folder
+    above it, e.g. 'Show/Season 1/Show.S01E01.mkv'. Sidecars are found using
+    one listing per folder.
+    """
+    stat_cache = get_stat_cache()
+    if media is MediaType.MOVIE:
+        candidates = [Path(file_path.parent, f"{file_path.stem}.nfo")]
+        # like Kodi, folders holding several movies don't share a 'movie.nfo'
+        if not _has_other_videos(file_path, stat_cache.listdir(file_path.parent)):
+            candidates.append(Path(file_path.parent, "movie.nfo"))
+    elif media is MediaType.EPISODE:
+        candidates = [
+            Path(file_path.parent, "tvshow.nfo"),
+            Path(file_path.parent.parent, "tvshow.nfo"),
+        ]
+    else:
+        return {}
+    for nfo_path in candidates:
+        if nfo_path.name not in stat_cache.listdir(nfo_path.parent):
+            continue
+        st = stat_cache.stat(nfo_path)
+        if not st or st.st_size > NFO_SIZE_LIMIT:
+            continue
+        ids = read_ids(nfo_path, NFO_ROOTS[media], st.st_mtime_ns)
+        if ids:
+            return ids
+    return {}
+
+
+@lru_cache(maxsize=256)
+def read_ids(nfo_path: Path, root: str, mtime: int = 0) -> dict[str, str]:
+    """
+    Parses the provider IDs from an nfo file whose root element is root. Files
+    only containing links to provider pages are also supported. mtime is only
+    used to invalidate memoized results.
+    """
+    try:
+        text = nfo_path.read_text(errors="replace")
+    except OSError:
+        return {}
+    ids = {}
+    for attr, pattern in NFO_URL_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            ids[attr] = match[1]
+    # nfo files may be followed by a link after their closing tag
+    end = text.rfind(f"</{root}>")
+    if end < 0:
+        return _valid(ids)
+    try:
+        element = ElementTree.fromstring(text[: end + len(root) + 3])
+    except ElementTree.ParseError:
+        return _valid(ids)
+    if element.tag != root:
+        return {}  # e.g. an episode's own nfo, whose IDs aren't the series'
+    for uniqueid in element.findall("uniqueid"):
+        ids[f"id_{uniqueid.get('type', '').lower()}"] = (uniqueid.text or "").strip()
+    for attr in ("imdb", "tmdb", "tvdb", "tvmaze"):
+        value = element.findtext(f"{attr}id")
+        if value:
+            ids.setdefault(f"id_{attr}", value.strip())
+    legacy_id = (element.findtext("id") or "").strip()
+    if legacy_id.startswith("tt"):
+        ids.setdefault("id_imdb", legacy_id)
+    elif legacy_id.isdigit() and root == "tvshow":
+        ids.setdefault("id_tvdb", legacy_id)
+    return _valid(ids)
+
+
+def _has_other_videos(file_path: Path, names: Iterable[str]) -> bool:
+    suffixes = {*VIDEO_CONTAINERS, file_path.suffix.lower()}
+    return any(
+        name != file_path.name and Path(name).suffix.lower() in suffixes
+        for name in names
+    )
+
+
+def _valid(ids: dict[str, str]) -> dict[str, str]:
+    return {
+        attr: value
+        for attr, value in ids.items()
+        if attr in NFO_URL_PATTERNS
+        and re.fullmatch(r"tt\d+" if attr == "id_imdb" else r"\d+", value)
+    }
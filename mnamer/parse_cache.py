@@ -0,0 +1,71 @@
+"""Persists filename parsing results so that later runs can skip guessit."""
+
+import pickle
+import sqlite3
+from os import PathLike
+from pathlib import Path
+from typing import Any
+
+from mnamer.const import PARSE_CACHE_PATH, guessit_version
+
+ParseKey = tuple[str, str, str, str]
+
+
+class ParseCache:
+    """
+    A sqlite-backed cache of raw guessit results keyed by the parsed string,
+    the media type and language options, and the guessit version, so that
+    upgrading guessit invalidates previous results.
+    """
+
+    def __init__(self, path: str | PathLike = PARSE_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS parses ("
+            "name TEXT, media TEXT, language TEXT, version TEXT, "
+            "result BLOB, PRIMARY KEY (name, media, language, version)"
+            ") WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def key_for(name: str, options: dict[str, Any]) -> ParseKey:
+        media = options.get("type")
+        language = options.get("language")
+        return (
+            name,
+            media.value if media else "",
+            language.a3 if language else "",
+            guessit_version,
+        )
+
+    def get(self, name: str, options: dict[str, Any]) -> dict[str, Any] | None:
+        """Returns the cached result for name parsed using options, if any."""
+        row = self._connection.execute(
+            "SELECT result FROM parses "
+            "WHERE name = ? AND media = ? AND language = ? AND version = ?",
+            self.key_for(name, options),
+        ).fetchone()
+        if not row:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:  # e.g. pickled by an incompatible dependency version
+            return None
+
+    def set(self, name: str, options: dict[str, Any], result: dict[str, Any]):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO parses VALUES (?, ?, ?, ?, ?)",
+            (*self.key_for(name, options), pickle.dumps(result)),
+        )
+
+    def clear(self) -> None:
+        self._connection.execute("DELETE FROM parses")
+        self._connection.commit()
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
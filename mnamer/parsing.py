@@ -0,0 +1,452 @@
+"""Filename parsing, optionally spread across a pool of worker processes."""
+
+import multiprocessing
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from babelfish import COUNTRY_MATRIX, LANGUAGE_MATRIX  # type: ignore
+from guessit import guessit  # type: ignore
+from guessit.options import load_config  # type: ignore
+
+from mnamer.const import CURRENT_YEAR
+from mnamer.exceptions import MnamerException
+from mnamer.language import Language
+from mnamer.parse_cache import ParseCache
+from mnamer.setting_store import SettingStore
+from mnamer.types import MediaType
+from mnamer.utils import is_subtitle
+
+ParseInput = tuple[Path, dict[str, Any]]
+SiblingKey = tuple[str, str, str, str]
+
+CHUNK_SIZE = 16
+
+SIBLINGS_SIZE = 1024
+
+# release tags recognized by the fast path and the property guessit gives them
+FAST_PATH_TAGS = {
+    "480p": ("screen_size", "480p"),
+    "576p": ("screen_size", "576p"),
+    "720p": ("screen_size", "720p"),
+    "1080p": ("screen_size", "1080p"),
+    "2160p": ("screen_size", "2160p"),
+    "bluray": ("source", "Blu-ray"),
+    "hdtv": ("source", "HDTV"),
+    "web": ("source", "Web"),
+    "web-dl": ("source", "Web"),
+    "h264": ("video_codec", "H.264"),
+    "x264": ("video_codec", "H.264"),
+    "x265": ("video_codec", "H.265"),
+    "xvid": ("video_codec", "Xvid"),
+    "aac": ("audio_codec", "AAC"),
+    "ac3": ("audio_codec", "Dolby Digital"),
+}
+
+# words which guessit's patterns join to a preceding tag across a hyphen,
+# e.g. 'WEB-DL', 'DVD-Rip' or '3-CD', so that groups like 'WEB-HDGRP' differ
+FAST_PATH_GROUP_PREFIXES = tuple("br cam cap cd dl dvd hd mux rip sd tv web".split())
+
+FAST_PATH_MIMETYPES = {
+    "avi": "video/x-msvideo",
+    "mkv": "video/x-matroska",
+    "mp4": "video/mp4",
+}
+
+FAST_PATH_PATTERN = re.compile(
+    r"(?P<title>[A-Za-z][a-z]*(?:\.[A-Za-z][a-z]*)*)"
+    r"\.(?:[Ss](?P<season>\d\d)[Ee](?P<episode>\d\d)|(?P<year>\d{4}))"
+    r"(?P<tags>(?:\.(?i:web-dl|[a-z0-9]+))*)"
+    r"(?:-(?P<group>[A-Za-z0-9]+))?"
+    r"\.(?P<container>avi|mkv|mp4)"
+)
+
+# folder names covering several seasons, e.g. 'Seasons 1-2' or 'Show.S01-S03'
+SEASON_PACK_PATTERN = re.compile(
+    r"(?<!['’])\b(?:seasons?|saisons?|s)[ ._-]*\d{1,2}"
+    r"(?:[ ._-]*(?:-|&|,|\.|and|to)[ ._-]*(?:seasons?|s)?[ ._-]*\d{1,2})+\b",
+    re.IGNORECASE,
+)
+
+# season markers in filenames, e.g. 'S02E01', '2x01' or 'Season 2', which
+# spare them a filename-only parse; others, e.g. '205', are found by parsing
+SEASON_MARKER_PATTERN = re.compile(
+    r"(?<![a-z'’])(?:seasons?|saisons?|s)[ ._-]*\d{1,2}(?!\d)"
+    r"|(?<![0-9a-z])\d{1,2}x\d",
+    re.IGNORECASE,
+)
+
+# words matched by guessit's rules which don't appear in its configuration
+GUESSIT_RULE_KEYWORDS = (
+    "ahdtv avc bd cam cap cs dm dsr dth dvb dvd dvdivx dvdrip dxva final hdcam "
+    "hevc hi laserdisc minisode minisodes nced ncop op oped pilot ppv special tc "
+    "telecine telesync unaired vhs vod workprint wp"
+).split()
+
+fast_path_counts: Counter[str] = Counter()
+
+# numbers in filenames and whether they follow a season or episode marker
+SIBLING_NUMBER_PATTERN = re.compile(
+    r"(?P<marker>(?:[se]|ep|episode[ ._]?|season[ ._]?|(?<=[0-9])x| - )"
+    r"(?=[0-9]))?(?P<number>[0-9]+)",
+    re.IGNORECASE,
+)
+
+# numbers directly following a season or episode number which guessit may take
+# as more episodes, e.g. 'S01E03.5.1' or 'S01E03-E05', unlike tags like '.720p'
+SIBLING_ADJACENT_PATTERN = re.compile(
+    r"[ ._&+,-]*(?:e|ep|episode|[0-9]+x)?[0-9]+(?![0-9a-z])", re.IGNORECASE
+)
+
+# the last path guessit parsed in each folder by its digit-masked filename and
+# the options used, along with its result
+_siblings: dict[SiblingKey, tuple[Path, dict[str, Any]]] = {}
+
+
+class _Keywords(NamedTuple):
+    phrases: frozenset[str]  # lowercase words and phrases matched as a whole
+    stems: re.Pattern  # regular expression stems matched at the start of words
+    infixes: re.Pattern  # matched at either end of unseparated words
+
+
+@cache
+def _guessit_keywords() -> _Keywords:
+    """Gathers the words guessit may match as a property."""
+    config = load_config({})
+    phrases: set[str] = set()
+    stems: set[str] = set()
+    infixes: set[str] = set()
+
+    def collect(value: Any):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                collect(k)
+                collect(v)
+        elif isinstance(value, list):
+            for v in value:
+                collect(v)
+        elif isinstance(value, str) and not value.startswith(("import:", "lambda")):
+            words = re.findall(r"[a-z]{2,}", value.lower())
+            infixes.update(word for word in words if len(word) > 2)
+            if re.search(r"[\\()\[\]?*+|{]", value):  # regular expression
+                phrases.update(words)
+                stems.update(word for word in words if len(word) > 2)
+            else:
+                phrases.add(" ".join(re.findall(r"[a-z0-9]+", value.lower())))
+
+    collect({k: v for k, v in config["advanced_config"].items() if k != "title"})
+    # title articles and stop words are only matched as part of other phrases,
+    # e.g. 'The CW', or next to numbers, e.g. 'CD1 of 2'
+    title_config = config["advanced_config"]["title"]
+    stop_words = set(title_config["articles"] + title_config["title_stop_words"])
+    phrases -= stop_words
+    stems -= stop_words
+    infixes.update(word for word in stop_words if len(word) > 2)
+    phrases.update(GUESSIT_RULE_KEYWORDS)
+    phrases.update(FAST_PATH_TAGS)
+    for language in LANGUAGE_MATRIX:
+        if {language.alpha2, language.alpha3} & set(config["allowed_languages"]):
+            phrases.update(language[:4])
+            phrases.update(re.findall(r"[a-z]{2,}", language.name.lower()))
+    for country in COUNTRY_MATRIX:
+        if country.alpha2.lower() in config["allowed_countries"]:
+            phrases.add(country.alpha2.lower())
+            phrases.update(re.findall(r"[a-z]{2,}", country.name.lower()))
+    phrases.discard("")
+    infix_pattern = "|".join(sorted(infixes))
+    return _Keywords(
+        frozenset(phrases),
+        re.compile("|".join(sorted(stems)), re.IGNORECASE),
+        re.compile(f"^(?:{infix_pattern})|(?:{infix_pattern})$", re.IGNORECASE),
+    )
+
+
+def _has_keyword(words: list[str], keywords: _Keywords) -> bool:
+    if any(keywords.stems.match(word) for word in words):
+        return True
+    words = [word.lower() for word in words]
+    for length in range(1, min(len(words), 4) + 1):
+        for i in range(len(words) - length + 1):
+            if " ".join(words[i : i + length]) in keywords.phrases:
+                return True
+    return False
+
+
+def fast_guess(file_path: Path, options: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Parses common scene release names like 'Series.Name.S01E02.1080p.WEB-GRP.mkv'
+    or 'Movie.Name.2019.BluRay.x264-GRP.mkv' into the same result as guessit,
+    returning None for names which it can't be certain of. Outcomes are tallied
+    in fast_path_counts.
+    """
+    raw_data = _fast_guess(file_path, options)
+    fast_path_counts["hit" if raw_data else "miss"] += 1
+    return raw_data
+
+
+def _fast_guess(file_path: Path, options: dict[str, Any]) -> dict[str, Any] | None:
+    match = FAST_PATH_PATTERN.fullmatch(file_path.name)
+    if not match:
+        return None
+    keywords = _guessit_keywords()
+    # guessit also picks up properties from directory names
+    for part in file_path.parent.parts:
+        if part == file_path.anchor:
+            continue
+        if not (part.isascii() and part.replace(" ", "").isalpha()):
+            return None
+        if _has_keyword(part.split(), keywords):
+            return None
+    words = match["title"].split(".")
+    if _has_keyword(words, keywords):
+        return None
+    raw_data: dict[str, Any] = {"title": " ".join(words)}
+    media = options.get("type")
+    if match["season"]:
+        if media not in (None, MediaType.EPISODE):
+            return None
+        raw_data["season"] = int(match["season"])
+        raw_data["episode"] = int(match["episode"])
+    else:
+        if media not in (None, MediaType.MOVIE):
+            return None
+        year = int(match["year"])
+        if not 1920 <= year <= CURRENT_YEAR + 1:
+            return None
+        raw_data["year"] = year
+    for tag in match["tags"].split(".")[1:]:
+        key, value = FAST_PATH_TAGS.get(tag.lower(), (None, None))
+        if not key or key in raw_data:
+            return None
+        raw_data[key] = value
+    if raw_data.get("screen_size") == "2160p" and raw_data.get("source") == "Blu-ray":
+        return None  # guessit reports these as 'Ultra HD Blu-ray'
+    group = match["group"]
+    if group:
+        # without tags guessit takes a trailing group to be part of the title
+        if not match["tags"] or len(group) < 3 or _has_keyword([group], keywords):
+            return None
+        if keywords.infixes.search(group):
+            return None
+        if group.lower().startswith(FAST_PATH_GROUP_PREFIXES):
+            return None
+        # digits may be read as a part, bonus or cd count, e.g. 'Pt10' or 'x10'
+        if any(char.isdigit() for char in group):
+            return None
+        # guessit may also match keywords within camel cased groups, e.g. 'PpvScr'
+        if _has_keyword(re.findall("[A-Z][a-z]{2,}", group), keywords):
+            return None
+        raw_data["release_group"] = group
+    raw_data["container"] = match["container"]
+    raw_data["mimetype"] = FAST_PATH_MIMETYPES[match["container"]]
+    raw_data["type"] = media or ("episode" if match["season"] else "movie")
+    return raw_data
+
+
+def sibling_guess(file_path: Path, options: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Derives guessit's result for a file from that of a file parsed before it in
+    the same folder whose name only differs by its season and episode numbers,
+    e.g. 'Show.S01E03.720p-GRP.mkv' from 'Show.S01E02.720p-GRP.mkv', so that
+    the series title, year and group are only parsed once per folder. Returns
+    None if there is no such file, if its numbers can't be told apart, or if
+    guessit could take the numbers following them as more episodes.
+    """
+    sibling = _siblings.get(_sibling_key(file_path, options))
+    if not sibling:
+        return None
+    sibling_path, sibling_data = sibling
+    sibling_numbers = [int(n) for n in re.findall("[0-9]+", str(sibling_path))]
+    numbers = [int(n) for n in re.findall("[0-9]+", str(file_path))]
+    raw_data = dict(sibling_data)
+    for old, new in zip(
+        SIBLING_NUMBER_PATTERN.finditer(sibling_path.name),
+        SIBLING_NUMBER_PATTERN.finditer(file_path.name),
+        strict=True,
+    ):
+        if old["number"] == new["number"]:
+            continue
+        # numbers must be marked as a season or episode, and may not be taken
+        # for a year or coincide with another number which guessit could
+        # confuse them with
+        if not old["marker"] or len(old["number"]) > 3:
+            return None
+        old_value = int(old["number"])
+        new_value = int(new["number"])
+        if not old_value or not new_value:
+            return None
+        if sibling_numbers.count(old_value) != 1 or numbers.count(new_value) != 1:
+            return None
+        if SIBLING_ADJACENT_PATTERN.match(
+            sibling_path.name, old.end()
+        ) or SIBLING_ADJACENT_PATTERN.match(file_path.name, new.end()):
+            return None
+        keys = [k for k in ("season", "episode") if sibling_data.get(k) == old_value]
+        if len(keys) != 1:
+            return None
+        raw_data[keys[0]] = new_value
+    return raw_data
+
+
+def clear_siblings():
+    """Forgets the files parsed so far, e.g. before each run."""
+    _siblings.clear()
+
+
+def _sibling_key(file_path: Path, options: dict[str, Any]) -> SiblingKey:
+    media = options.get("type")
+    language = options.get("language")
+    return (
+        str(file_path.parent),
+        re.sub("[0-9]", "0", file_path.name),
+        media.value if media else "",
+        language.a3 if language else "",
+    )
+
+
+def _add_sibling(file_path: Path, options: dict[str, Any], raw_data: dict[str, Any]):
+    if len(_siblings) >= SIBLINGS_SIZE:
+        del _siblings[next(iter(_siblings))]  # evict oldest
+    _siblings[_sibling_key(file_path, options)] = (file_path, raw_data)
+
+
+def guess(file_path: Path, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns guessit's raw result for a file path, trying the fast path and the
+    results of its siblings first.
+    """
+    raw_data = fast_guess(file_path, options)
+    if raw_data is None:
+        raw_data = sibling_guess(file_path, options)
+    if raw_data is None:
+        raw_data = _guessit(file_path, options)
+        _add_sibling(file_path, options, raw_data)
+    return raw_data
+
+
+def _guessit(file_path: Path, options: dict[str, Any]) -> dict[str, Any]:
+    if _in_season_pack(file_path) and not SEASON_MARKER_PATTERN.search(file_path.name):
+        # guessit would return the folder's seasons for files without one,
+        # while files with their own take properties from the folder too
+        raw_data = dict(guessit(file_path.name, options))
+        if raw_data.get("season") is None:
+            return raw_data
+    raw_data = dict(guessit(str(file_path), options))
+    if isinstance(raw_data.get("season"), list) and len(file_path.parts) > 1:
+        raw_data = dict(guessit(file_path.name, options))
+    return raw_data
+
+
+def _in_season_pack(file_path: Path) -> bool:
+    return any(SEASON_PACK_PATTERN.search(part) for part in file_path.parent.parts)
+
+
+def guess_input(file_path: Path, settings: SettingStore) -> tuple[Path, dict[str, Any]]:
+    """
+    Returns the path and options guessit should parse a file with; subtitles
+    have their language code suffix parsed and stripped beforehand.
+    """
+    language = settings.language
+    if is_subtitle(file_path):
+        try:
+            language = Language.parse(file_path.stem[-2:])
+            file_path = Path(file_path.parent, file_path.stem[:-2])
+        except MnamerException:
+            pass
+    return file_path, {"type": settings.media, "language": language}
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Workers aren't forked from mnamer's own process, where crawling threads
+    may still hold locks, but from a fresh server process which imports this
+    module once, or are spawned where that isn't supported.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def prefetch(
+    file_paths: Iterable[Path],
+    settings: SettingStore,
+    parse_cache: ParseCache,
+    jobs: int,
+) -> Iterator[Path]:
+    """
+    Lazily yields file_paths in order once guessit results for them are in
+    parse_cache, parsing those the fast path and their siblings can't in chunks
+    across a pool of jobs processes. Files with siblings already being parsed
+    wait for their results. The next batch of paths is submitted before the
+    current one is yielded so that workers stay busy while targets are created
+    from it.
+    """
+    file_paths = iter(file_paths)
+    with ProcessPoolExecutor(jobs, mp_context=_mp_context()) as executor:
+
+        def parse(misses: list[ParseInput]) -> Iterator[dict]:
+            if not misses:
+                return iter(())
+            guess_paths, options = zip(*misses, strict=True)
+            return executor.map(_guessit, guess_paths, options, chunksize=CHUNK_SIZE)
+
+        def submit() -> tuple[
+            list[Path], list[ParseInput], Iterator[dict], list[ParseInput]
+        ]:
+            batch = list(islice(file_paths, CHUNK_SIZE * jobs))
+            misses: list[ParseInput] = []
+            deferred: list[ParseInput] = []
+            siblings: Counter[SiblingKey] = Counter()
+            for guess_path, options in map(guess_input, batch, repeat(settings)):
+                if parse_cache.get(str(guess_path), options) is not None:
+                    continue
+                raw_data = fast_guess(guess_path, options)
+                if raw_data is None:
+                    raw_data = sibling_guess(guess_path, options)
+                sibling_key = _sibling_key(guess_path, options)
+                if raw_data is not None:
+                    parse_cache.set(str(guess_path), options, raw_data)
+                # two siblings are parsed in case the first's numbers are ambiguous
+                elif siblings[sibling_key] >= 2:
+                    deferred.append((guess_path, options))
+                else:
+                    siblings[sibling_key] += 1
+                    misses.append((guess_path, options))
+            return batch, misses, parse(misses), deferred
+
+        def collect(
+            misses: list[ParseInput],
+            results: Iterator[dict],
+            deferred: list[ParseInput],
+        ):
+            for (guess_path, options), raw_data in zip(misses, results, strict=True):
+                parse_cache.set(str(guess_path), options, raw_data)
+                _add_sibling(guess_path, options, raw_data)
+            retries: list[ParseInput] = []
+            for guess_path, options in deferred:
+                sibling_data = sibling_guess(guess_path, options)
+                if sibling_data is None:
+                    retries.append((guess_path, options))
+                else:
+                    parse_cache.set(str(guess_path), options, sibling_data)
+            if retries:
+                collect(retries, parse(retries), [])
+
+        batch, misses, results, deferred = submit()
+        while batch:
+            next_batch, next_misses, next_results, next_deferred = submit()
+            collect(misses, results, deferred)
+            yield from batch
+            batch, misses, results, deferred = (
+                next_batch,
+                next_misses,
+                next_results,
+                next_deferred,
+            )
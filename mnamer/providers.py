@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import copy
 import datetime as dt
 from abc import ABC, abstractmethod
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
 from os import environ
+from typing import Any
 
 from mnamer.endpoints import (
     omdb_search,
@@ -16,7 +18,6 @@ from mnamer.endpoints import (
     tvdb_search_series,
     tvdb_series_id,
     tvdb_series_id_episodes_query,
-    tvmaze_episode_by_number,
     tvmaze_episodes_by_date,
     tvmaze_show,
     tvmaze_show_episodes_list,
@@ -36,6 +37,7 @@ class Provider(ABC):
 
     api_key: str | None = None
     cache: bool = True
+    memo_size: int = 64
 
     def __init__(self, api_key: str | None = None, cache: bool = True):
         """Initializes the provider."""
@@ -43,6 +45,7 @@ class Provider(ABC):
             self.api_key = api_key
         if cache:
             self.cache = cache
+        self._responses: dict[tuple, Any] = {}
 
     @classmethod
     def from_settings(cls, settings: SettingStore):
@@ -56,6 +59,56 @@ class Provider(ABC):
     def search(self, query) -> Iterator[Metadata]:
         pass
 
+    def clear_memo(self):
+        """Forgets memoized responses, e.g. so new episodes can be found."""
+        self._responses.clear()
+
+    def _memoize(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the result of fetch, calling it only once per key until it is
+        cleared or evicted, e.g. so that all the files of a season pack share a
+        single episode list request. Only the latest memo_size keys are kept.
+        """
+        if key not in self._responses:
+            if len(self._responses) >= self.memo_size:
+                del self._responses[next(iter(self._responses))]
+            self._responses[key] = fetch()
+        return self._responses[key]
+
+    @staticmethod
+    def _select_episodes(
+        episodes: Iterable[MetadataEpisode],
+        season: int | None,
+        episode: int | None,
+        episode_last: int | None = None,
+    ) -> Iterator[MetadataEpisode]:
+        """
+        Filters a series' episodes by season and episode. The episodes of a
+        range within a season are merged into a single result if the series
+        has all of them, otherwise its first episode is used on its own.
+        """
+        selected = []
+        for meta in episodes:
+            if season is not None and season != meta.season:
+                continue
+            if episode is not None:
+                if meta.episode is None:
+                    continue
+                if not episode <= meta.episode <= (episode_last or episode):
+                    continue
+            selected.append(copy.copy(meta))
+        if season is None or episode is None or episode_last in (None, episode):
+            yield from selected
+        elif len({meta.episode for meta in selected}) == episode_last - episode + 1:
+            selected.sort(key=lambda meta: meta.episode or 0)
+            merged = selected[0]
+            merged.episode_last = episode_last
+            titles = [meta.title for meta in selected if meta.title]
+            merged.title = " & ".join(dict.fromkeys(titles)) or None
+            yield merged
+        else:
+            yield from (meta for meta in selected if meta.episode == episode)
+
     @staticmethod
     def provider_factory(provider: ProviderType, settings: SettingStore) -> Provider:
         """Factory function for DB Provider concrete classes."""
@@ -232,13 +285,21 @@ class Tvdb(Provider):
             results = self._search_tvdb_date(query.id_tvdb, query.date, query.language)
         elif query.id_tvdb:
             results = self._search_id(
-                query.id_tvdb, query.season, query.episode, query.language
+                query.id_tvdb,
+                query.season,
+                query.episode,
+                query.language,
+                query.episode_last,
             )
         elif query.series and query.date:
             results = self._search_series_date(query.series, query.date, query.language)
         elif query.series:
             results = self._search_series(
-                query.series, query.season, query.episode, query.language
+                query.series,
+                query.season,
+                query.episode,
+                query.language,
+                query.episode_last,
             )
         else:
             raise MnamerNotFoundException
@@ -250,45 +311,73 @@ class Tvdb(Provider):
         season: int | None = None,
         episode: int | None = None,
         language: Language | None = None,
+        episode_last: int | None = None,
     ):
         found = False
+        # whole seasons are requested so that their episodes share a request,
+        # episodes of an unknown season are filtered by tvdb instead
+        episode_filter = episode if season is None else None
+        episodes = self._memoize(
+            (
+                "episodes",
+                str(id_tvdb),
+                season,
+                episode_filter,
+                language and language.a2,
+            ),
+            lambda: self._episodes(id_tvdb, season, episode_filter, language),
+        )
+        for meta in self._select_episodes(episodes, season, episode, episode_last):
+            found = True
+            yield meta
+        if not found:
+            raise MnamerNotFoundException
+
+    def _episodes(
+        self,
+        id_tvdb: str,
+        season: int | None,
+        episode: int | None,
+        language: Language | None,
+    ) -> list[MetadataEpisode]:
         series_data = tvdb_series_id(
             self.token, id_tvdb, language=language, cache=self.cache
         )
+        episodes = []
         page = 1
         while True:
             episode_data = tvdb_series_id_episodes_query(
                 self.token,
                 id_tvdb,
-                episode,
-                season,
+                episode=episode,
+                season=season,
                 language=language,
                 page=page,
                 cache=self.cache,
             )
             for entry in episode_data["data"]:
                 try:
-                    yield MetadataEpisode(
-                        date=entry["firstAired"],
-                        episode=entry["airedEpisodeNumber"],
-                        id_tvdb=id_tvdb,
-                        season=entry["airedSeason"],
-                        series=series_data["data"]["seriesName"],
-                        language=language,
-                        synopsis=(entry["overview"] or "")
-                        .replace("\r\n", "")
-                        .replace("  ", "")
-                        .strip(),
-                        title=entry["episodeName"].split(";", 1)[0],
+                    episodes.append(
+                        MetadataEpisode(
+                            date=entry["firstAired"],
+                            episode=entry["airedEpisodeNumber"],
+                            id_tvdb=id_tvdb,
+                            season=entry["airedSeason"],
+                            series=series_data["data"]["seriesName"],
+                            language=language,
+                            synopsis=(entry["overview"] or "")
+                            .replace("\r\n", "")
+                            .replace("  ", "")
+                            .strip(),
+                            title=entry["episodeName"].split(";", 1)[0],
+                        )
                     )
-                    found = True
                 except (AttributeError, KeyError, ValueError):
                     continue
             if page == episode_data["links"]["last"]:
                 break
             page += 1
-        if not found:
-            raise MnamerNotFoundException
+        return episodes
 
     def _search_series(
         self,
@@ -296,6 +385,7 @@ class Tvdb(Provider):
         season: int | None,
         episode: int | None,
         language: Language | None,
+        episode_last: int | None = None,
     ):
         found = False
         series_data = tvdb_search_series(
@@ -304,7 +394,9 @@ class Tvdb(Provider):
 
         for series_id in [entry["id"] for entry in series_data["data"][:5]]:
             try:
-                for data in self._search_id(series_id, season, episode, language):
+                for data in self._search_id(
+                    series_id, season, episode, language, episode_last
+                ):
                     if not data.series or not data.season:
                         continue
                     found = True
@@ -353,7 +445,7 @@ class TvMaze(Provider):
     def search(self, query: MetadataEpisode) -> Iterator[MetadataEpisode]:
         if query.id_tvmaze and query.season and query.episode:
             yield from self._lookup_with_tmaze_id_and_season_and_episode(
-                query.id_tvmaze, query.season, query.episode
+                query.id_tvmaze, query.season, query.episode, query.episode_last
             )
         elif (query.id_tvmaze or query.id_tvdb) and query.date:
             yield from self._lookup_with_id_and_date(
@@ -361,35 +453,45 @@ class TvMaze(Provider):
             )
         elif query.id_tvmaze or query.id_tvdb:
             yield from self._lookup_with_id(
-                query.id_tvmaze, query.id_tvdb, query.season, query.episode
-            )
-        elif query.series and query.season and query.episode:
-            yield from self._search_with_season_and_episode(
-                query.series, query.season, query.episode
+                query.id_tvmaze,
+                query.id_tvdb,
+                query.season,
+                query.episode,
+                query.episode_last,
             )
         elif query.series:
-            yield from self._search(query.series, query.season, query.episode)
+            yield from self._search(
+                query.series, query.season, query.episode, query.episode_last
+            )
         else:
             raise MnamerNotFoundException
 
     def _lookup_with_tmaze_id_and_season_and_episode(
-        self, id_tvmaze: str, season: int | None, episode: int | None
+        self,
+        id_tvmaze: str,
+        season: int | None,
+        episode: int | None,
+        episode_last: int | None = None,
     ) -> Iterator[MetadataEpisode]:
-        series_data = tvmaze_show(id_tvmaze)
-        episode_data = tvmaze_episode_by_number(id_tvmaze, season, episode)
+        series_data = self._show(id_tvmaze)
         id_tvdb = series_data["externals"]["thetvdb"]
-        yield self._transform_meta(id_tvmaze, id_tvdb, series_data, episode_data)
+        episodes = self._episodes(id_tvmaze, id_tvdb, series_data)
+        results = list(self._select_episodes(episodes, season, episode, episode_last))
+        if not results:
+            raise MnamerNotFoundException
+        yield from results
 
     def _lookup_with_id_and_date(
         self, id_tvmaze: str | None, id_tvdb: str | None, air_date: dt.date
     ) -> Iterator[MetadataEpisode]:
         assert id_tvmaze or id_tvdb
         if id_tvmaze:
-            series_data = tvmaze_show(id_tvmaze)
+            series_data = self._show(id_tvmaze)
             query_id_tvmaze = id_tvmaze
             query_id_tvdb = series_data["externals"]["thetvdb"]
         else:
-            series_data = tvmaze_show_lookup(id_tvdb=id_tvdb)
+            assert id_tvdb
+            series_data = self._show_lookup(id_tvdb)
             query_id_tvmaze = series_data["id"]
             query_id_tvdb = id_tvdb
         episode_data = tvmaze_episodes_by_date(query_id_tvmaze, air_date)
@@ -404,69 +506,66 @@ class TvMaze(Provider):
         id_tvdb: str | None,
         season: int | None,
         episode: int | None,
+        episode_last: int | None = None,
     ) -> Iterator[MetadataEpisode]:
         assert id_tvmaze or id_tvdb
         if id_tvmaze:
             query_id_tvmaze = id_tvmaze
-            series_data = tvmaze_show(id_tvmaze)
+            series_data = self._show(id_tvmaze)
             query_id_tvdb = series_data["externals"]["thetvdb"]
         else:
-            series_data = tvmaze_show_lookup(id_tvdb=id_tvdb)
+            assert id_tvdb
+            series_data = self._show_lookup(id_tvdb)
             query_id_tvdb = id_tvdb
             query_id_tvmaze = series_data["id"]
-        episode_data = tvmaze_show_episodes_list(query_id_tvmaze)
-        for episode_entry in episode_data:
-            meta = self._transform_meta(
-                query_id_tvmaze, query_id_tvdb, series_data, episode_entry
-            )
-            if season is not None and season != meta.season:
-                continue
-            if episode is not None and episode != meta.episode:
-                continue
-            yield meta
+        episodes = self._episodes(query_id_tvmaze, query_id_tvdb, series_data)
+        yield from self._select_episodes(episodes, season, episode, episode_last)
 
-    def _search_with_season_and_episode(
-        self, series: str, season: int | None, episode: int | None
+    def _search(
+        self,
+        series: str,
+        season: int | None,
+        episode: int | None,
+        episode_last: int | None = None,
     ) -> Iterator[MetadataEpisode]:
-        assert season
-        series_data = tvmaze_show_search(series)
+        assert series
+        series_data = self._memoize(
+            ("search", series), lambda: tvmaze_show_search(series)
+        )
         for idx, series_entry in enumerate(series_data):
             if idx >= 3:
                 break
             series_entry = series_entry["show"]
             id_tvmaze = series_entry["id"]
+            id_tvdb = series_entry["externals"]["thetvdb"]
             try:
-                episode_entry = tvmaze_episode_by_number(id_tvmaze, season, episode)
+                episodes = self._episodes(id_tvmaze, id_tvdb, series_entry)
             except MnamerNotFoundException:
                 continue
-            meta = self._transform_meta(id_tvmaze, None, series_entry, episode_entry)
-            if season is not None and season != meta.season:
-                continue
-            if episode is not None and episode != meta.episode:
-                continue
-            yield meta
+            yield from self._select_episodes(episodes, season, episode, episode_last)
 
-    def _search(
-        self, series: str, season: int | None, episode: int | None
-    ) -> Iterator[MetadataEpisode]:
-        assert series
-        series_data = tvmaze_show_search(series)
-        for idx, series_entry in enumerate(series_data):
-            if idx >= 3:
-                break
-            series_entry = series_entry["show"]
-            id_tvmaze = series_entry["id"]
-            episode_data = tvmaze_show_episodes_list(id_tvmaze)
-            for episode_entry in episode_data:
-                id_tvdb = series_entry["externals"]["thetvdb"]
-                meta = self._transform_meta(
-                    id_tvmaze, id_tvdb, series_entry, episode_entry
-                )
-                if season is not None and season != meta.season:
-                    continue
-                if episode is not None and episode != meta.episode:
-                    continue
-                yield meta
+    def _show(self, id_tvmaze: str) -> dict:
+        return self._memoize(("show", str(id_tvmaze)), lambda: tvmaze_show(id_tvmaze))
+
+    def _show_lookup(self, id_tvdb: str) -> dict:
+        return self._memoize(
+            ("lookup", str(id_tvdb)), lambda: tvmaze_show_lookup(id_tvdb=id_tvdb)
+        )
+
+    def _episodes(
+        self, id_tvmaze: str, id_tvdb: str | None, series_entry: dict
+    ) -> list[MetadataEpisode]:
+        """
+        A show's episodes, fetched as a single list rather than one request per
+        episode, and only once for all the files of the show.
+        """
+        return self._memoize(
+            ("episodes", str(id_tvmaze)),
+            lambda: [
+                self._transform_meta(id_tvmaze, id_tvdb, series_entry, episode_entry)
+                for episode_entry in tvmaze_show_episodes_list(id_tvmaze)
+            ],
+        )
 
     @staticmethod
     def _transform_meta(
@@ -0,0 +1,70 @@
+"""Persists the outcome of processing files so that later runs can skip them."""
+
+import sqlite3
+from os import PathLike
+from pathlib import Path
+
+from mnamer.const import SCAN_INDEX_PATH
+from mnamer.stat_cache import get_stat_cache
+from mnamer.types import ScanOutcome
+
+ScanKey = tuple[int, int, int, int]
+
+
+class ScanIndex:
+    """
+    A sqlite-backed index of processing outcomes keyed by a file's device,
+    inode, size, and modification time, so that files which are moved or
+    renamed in place keep their entry while files which change do not.
+    """
+
+    def __init__(self, path: str | PathLike = SCAN_INDEX_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            "device INTEGER, inode INTEGER, size INTEGER, mtime INTEGER, "
+            "outcome TEXT, PRIMARY KEY (device, inode, size, mtime)"
+            ") WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def key_for(path: str | PathLike) -> ScanKey | None:
+        """Returns the index key for a file, or None if it can't be stat'ed."""
+        st = get_stat_cache().stat(path)
+        if st is None:
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def outcome_for(self, path: str | PathLike) -> ScanOutcome | None:
+        """Returns the last recorded outcome for an unchanged file, if any."""
+        key = self.key_for(path)
+        if not key:
+            return None
+        row = self._connection.execute(
+            "SELECT outcome FROM scans "
+            "WHERE device = ? AND inode = ? AND size = ? AND mtime = ?",
+            key,
+        ).fetchone()
+        return ScanOutcome(row[0]) if row else None
+
+    def record(self, path: str | PathLike, outcome: ScanOutcome) -> None:
+        """Records the outcome of processing a file at its current location."""
+        key = self.key_for(path)
+        if not key:
+            return
+        self._connection.execute(
+            "INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?)",
+            (*key, outcome.value),
+        )
+
+    def clear(self) -> None:
+        self._connection.execute("DELETE FROM scans")
+        self._connection.commit()
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Any
 
 from mnamer.argument import ArgLoader
-from mnamer.const import SUBTITLE_CONTAINERS
+from mnamer.const import SUBTITLE_CONTAINERS, VIDEO_CONTAINERS
 from mnamer.exceptions import MnamerException
 from mnamer.language import Language
 from mnamer.metadata import Metadata
@@ -81,6 +81,39 @@ class SettingStore:
             help="-v, --verbose: increase output verbosity",
         ).as_dict(),
     )
+    watch: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--watch", "-w"],
+            group=SettingType.PARAMETER,
+            help="-w, --watch: keep running, processing files once they are written",
+        ).as_dict(),
+    )
+    collapse_hardlinks: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            dest="collapse_hardlinks",
+            flags=[
+                "--collapse_hardlinks",
+                "--collapse-hardlinks",
+                "--collapsehardlinks",
+            ],
+            group=SettingType.PARAMETER,
+            help="--collapse-hardlinks: only process one of several hard linked files",
+        ).as_dict(),
+    )
+    crawl_workers: int = dataclasses.field(
+        default=1,
+        metadata=SettingSpec(
+            dest="crawl_workers",
+            flags=["--crawl_workers", "--crawl-workers", "--crawlworkers"],
+            group=SettingType.PARAMETER,
+            help="--crawl-workers=<NUMBER>: list directories in parallel; e.g. for network shares",
+            typevar=int,
+        ).as_dict(),
+    )
     hits: int = dataclasses.field(
         default=5,
         metadata=SettingSpec(
@@ -99,6 +132,24 @@ class SettingStore:
             nargs="+",
         ).as_dict(),
     )
+    incremental: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--incremental"],
+            group=SettingType.PARAMETER,
+            help="--incremental: skip unchanged files handled by a previous run",
+        ).as_dict(),
+    )
+    jobs: int = dataclasses.field(
+        default=1,
+        metadata=SettingSpec(
+            flags=["--jobs"],
+            group=SettingType.PARAMETER,
+            help="--jobs=<NUMBER>: parse filenames in parallel using this many processes",
+            typevar=int,
+        ).as_dict(),
+    )
     language: Language | None = dataclasses.field(
         default=None,
         metadata=SettingSpec(
@@ -107,16 +158,17 @@ class SettingStore:
             help="--language=<LANG>: specify the search language",
         ).as_dict(),
     )
+    locality: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--locality"],
+            group=SettingType.PARAMETER,
+            help="--locality: process files grouped by series and season, except when streaming",
+        ).as_dict(),
+    )
     mask: list[str] = dataclasses.field(
-        default_factory=lambda: [
-            "avi",
-            "m4v",
-            "mp4",
-            "mkv",
-            "ts",
-            "wmv",
-        ]
-        + SUBTITLE_CONTAINERS,
+        default_factory=lambda: VIDEO_CONTAINERS + SUBTITLE_CONTAINERS,
         metadata=SettingSpec(
             flags=["--mask"],
             group=SettingType.PARAMETER,
@@ -124,6 +176,25 @@ class SettingStore:
             nargs="+",
         ).as_dict(),
     )
+    min_size: int = dataclasses.field(
+        default=0,
+        metadata=SettingSpec(
+            dest="min_size",
+            flags=["--min_size", "--min-size", "--minsize"],
+            group=SettingType.PARAMETER,
+            help="--min-size=<MB>: ignore smaller media files; e.g. samples",
+            typevar=int,
+        ).as_dict(),
+    )
+    nfo: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--nfo"],
+            group=SettingType.PARAMETER,
+            help="--nfo: read provider ids from .nfo sidecar files; e.g. written by Kodi",
+        ).as_dict(),
+    )
     no_guess: bool = dataclasses.field(
         default=False,
         metadata=SettingSpec(
@@ -154,6 +225,34 @@ class SettingStore:
             help="--no-style: print to stdout without using colour or unicode chars",
         ).as_dict(),
     )
+    skip_organized: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            dest="skip_organized",
+            flags=["--skip_organized", "--skip-organized", "--skiporganized"],
+            group=SettingType.PARAMETER,
+            help="--skip-organized: skip files already named using the format without querying",
+        ).as_dict(),
+    )
+    stream: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--stream"],
+            group=SettingType.PARAMETER,
+            help="--stream: process files as they are found instead of gathering them first",
+        ).as_dict(),
+    )
+    xattr: bool = dataclasses.field(
+        default=False,
+        metadata=SettingSpec(
+            action="store_true",
+            flags=["--xattr"],
+            group=SettingType.PARAMETER,
+            help="--xattr: store matches in extended file attributes; e.g. to skip lookups when re-run",
+        ).as_dict(),
+    )
     movie_api: ProviderType | str = dataclasses.field(
         default=ProviderType.TMDB,
         metadata=SettingSpec(
@@ -237,7 +336,7 @@ class SettingStore:
             dest="clear_cache",
             flags=["--clear_cache", "--clear-cache", "--clearcache"],
             group=SettingType.DIRECTIVE,
-            help="--clear-cache: clear request cache",
+            help="--clear-cache: clear request cache, parse cache and scan index",
         ).as_dict(),
     )
     config_dump: bool = dataclasses.field(
@@ -307,7 +406,7 @@ class SettingStore:
             dest="no_cache",
             flags=["--no_cache", "--no-cache", "--nocache"],
             group=SettingType.DIRECTIVE,
-            help="--no-cache: disable request cache",
+            help="--no-cache: disable request and parse caches",
         ).as_dict(),
     )
     media: MediaType | None = dataclasses.field(
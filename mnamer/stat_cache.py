@@ -0,0 +1,110 @@
+"""A run-scoped cache of file system lookups."""
+
+from os import DirEntry, PathLike, listdir, stat, stat_result
+from pathlib import Path
+from stat import S_ISREG
+
+
+class StatCache:
+    """
+    Memoizes stat and resolve lookups for the duration of a run so that a file
+    is only queried once, which matters on network mounts where each lookup is
+    a round trip. The cache can be seeded with os.scandir entries, and paths
+    must be invalidated when they are changed, e.g. after relocation.
+    """
+
+    def __init__(self, maxsize: int = 65_536):
+        self.maxsize = maxsize
+        self._stats: dict[str, DirEntry | stat_result | None] = {}
+        self._resolved: dict[str, Path] = {}
+        self._listings: dict[str, frozenset[str]] = {}
+        self._directories: set[str] = set()
+
+    def _store(self, cache: dict, key: str, value) -> None:
+        if len(cache) >= self.maxsize:
+            del cache[next(iter(cache))]  # evict oldest
+        cache[key] = value
+
+    def clear(self) -> None:
+        self._stats.clear()
+        self._resolved.clear()
+        self._listings.clear()
+        self._directories.clear()
+
+    def exists(self, path: str | PathLike) -> bool:
+        return self.stat(path) is not None
+
+    def invalidate(self, path: str | PathLike) -> None:
+        key = str(path)
+        self._stats.pop(key, None)
+        self._resolved.pop(key, None)
+        self._listings.pop(key, None)
+        self._listings.pop(str(Path(key).parent), None)
+
+    def is_file(self, path: str | PathLike) -> bool:
+        st = self.stat(path)
+        return st is not None and S_ISREG(st.st_mode)
+
+    def listdir(self, path: str | PathLike) -> frozenset[str]:
+        """Returns the names of a directory's entries, or none if unreadable."""
+        key = str(path)
+        names = self._listings.get(key)
+        if names is None:
+            try:
+                names = frozenset(listdir(key))
+            except OSError:
+                names = frozenset()
+            self._store(self._listings, key, names)
+        return names
+
+    def mkdir(self, path: Path) -> None:
+        """Creates a directory, including its parents, unless known to exist."""
+        key = str(path)
+        if key in self._directories:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._directories.add(key)
+
+    def resolve(self, path: Path) -> Path:
+        key = str(path)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = path.resolve()
+            self._store(self._resolved, key, resolved)
+        return resolved
+
+    def seed(self, entry: DirEntry) -> None:
+        """Seeds the cache with an entry yielded by os.scandir."""
+        if entry.path not in self._stats:
+            self._store(self._stats, entry.path, entry)
+
+    def stat(self, path: str | PathLike) -> stat_result | None:
+        """Returns the stat result for a path, following symlinks, or None."""
+        key = str(path)
+        try:
+            cached = self._stats[key]
+        except KeyError:
+            cached = self._stat(key)
+            self._store(self._stats, key, cached)
+            return cached
+        if isinstance(cached, DirEntry):
+            cached = self._stat(cached)
+            self._stats[key] = cached
+        return cached
+
+    @staticmethod
+    def _stat(path: str | DirEntry) -> stat_result | None:
+        try:
+            return path.stat() if isinstance(path, DirEntry) else stat(path)
+        except OSError:
+            return None
+
+
+def get_stat_cache() -> StatCache:
+    """Convenience function that returns the stat cache singleton."""
+    if hasattr(get_stat_cache, "cache"):
+        cache: StatCache = get_stat_cache.cache  # type: ignore[attr-defined]
+        return cache
+    cache = StatCache()
+    get_stat_cache.cache = cache  # type: ignore[attr-defined]
+    return cache
@@ -0,0 +1,125 @@
+"""Detects the language of subtitle files from their text."""
+
+import codecs
+import re
+import string
+from collections import Counter
+from pathlib import Path
+
+from mnamer.language import Language
+
+SNIFF_SIZE = 4096
+
+# the fewest words or letters a language needs to be detected with confidence
+SNIFF_MIN_HITS = 12
+
+SNIFF_NON_LATIN_PATTERN = re.compile(r"[^\x00-ɏ]")
+
+# ascii characters which separate words, including those of subtitle timing and
+# tags; translating encoded text is much faster than translating str objects
+SNIFF_SEPARATORS = bytes.maketrans(
+    (string.punctuation + string.digits).encode(),
+    b" " * len(string.punctuation + string.digits),
+)
+
+SNIFF_QUOTES = "¡¿«»‘’“”„–—…"
+
+# scripts which are only used by one or two of the known languages
+SNIFF_SCRIPT_PATTERNS = {
+    "ara": re.compile(r"[؀-ۿ]"),
+    "ell": re.compile(r"[Ͱ-Ͽ]"),
+    "heb": re.compile(r"[֐-׿]"),
+    "hin": re.compile(r"[ऀ-ॿ]"),
+    "jpn": re.compile(r"[぀-ヿ]"),
+    "kor": re.compile(r"[가-힯]"),
+    "rus": re.compile(r"[Ѐ-ӿ]"),
+    "zho": re.compile(r"[一-鿿]"),
+}
+
+# letters which tell languages sharing a script apart, e.g. Persian's 'پ', or
+# which belong to a language that isn't known, e.g. Serbian's 'ђ'
+SNIFF_SCRIPT_VARIANTS: dict[str, tuple[tuple[re.Pattern[str], str | None], ...]] = {
+    "ara": ((re.compile(r"[پچژگ]"), "fas"),),
+    "rus": (
+        (re.compile(r"[ЄІЇєіїҐґ]"), "ukr"),
+        (re.compile(r"[ЂЃЅЈЉЊЋЌЏђѓѕјљњћќџ]"), None),
+    ),
+}
+
+# common words which are distinctive to each language written in latin script
+SNIFF_STOPWORDS = {
+    "ces": "ale jak jsem jsi jen kde když mám není něco proč tady taky tak už že",
+    "dan": "af det er hvad hvorfor ikke jeg mig nej og også til",
+    "deu": "auf das der dich die ich ist mich mir mit nicht und wir zu",
+    "eng": "and are have just know that the this what with you your",
+    "fra": "avec dans est je les mais nous oui pas pour qui une vous",
+    "hrv": "biti gdje hajde mogu nije ovo samo sam smo što sve treba zašto",
+    "ita": "anche che cosa della gli hai il non perché questo sei sono",
+    "lat": "atque autem enim esse nec quae quod sed sunt ut",
+    "por": "com eles isso muito não obrigado também um uma você",
+    "slv": "bom kaj ki lahko nisem sem sva tudi tukaj zakaj zdaj",
+    "spa": "aquí bueno eso esto los muy pero qué tengo usted",
+    "swe": "att för inte jag och vad varför är",
+    "tur": "ama bir bu için değil evet gibi hayır şey var ve yok",
+}
+
+_languages_by_word = {
+    word: language
+    for language, words in SNIFF_STOPWORDS.items()
+    for word in words.split()
+}
+
+
+def sniff_language(file_path: Path) -> Language | None:
+    """
+    Detects the language of a subtitle file from the text at its start, or
+    returns None unless confident. Languages with their own script are told
+    apart by their letters, and the others by their most common words.
+    """
+    try:
+        with open(file_path, "rb") as fp:
+            text = _decode(fp.read(SNIFF_SIZE))
+    except OSError:
+        return None
+    language = _sniff_script(text) or _sniff_words(text)
+    return Language.parse(language) if language else None
+
+
+def _decode(data: bytes) -> str:
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16", errors="ignore")
+    try:
+        # the read may end partway through a character
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        return decoder.decode(data, final=False)
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+def _sniff_script(text: str) -> str | None:
+    if len(SNIFF_NON_LATIN_PATTERN.findall(text)) < SNIFF_MIN_HITS:
+        return None
+    for language, pattern in SNIFF_SCRIPT_PATTERNS.items():
+        if len(pattern.findall(text)) < SNIFF_MIN_HITS:
+            continue
+        if language == "jpn":
+            return language  # kana is only used by japanese, alongside chinese
+        for variant_pattern, variant in SNIFF_SCRIPT_VARIANTS.get(language, ()):
+            if variant_pattern.search(text):
+                return variant
+        return language
+    return None
+
+
+def _sniff_words(text: str) -> str | None:
+    hits: Counter[str] = Counter()
+    words = text.lower().encode().translate(SNIFF_SEPARATORS).decode().split()
+    for word, count in Counter(words).items():
+        language = _languages_by_word.get(word.strip(SNIFF_QUOTES))
+        if language:
+            hits[language] += count
+    ranked = hits.most_common(2) + [(None, 0)] * 2
+    (language, count), (_, runner_up_count) = ranked[:2]
+    if count < SNIFF_MIN_HITS or count < runner_up_count * 3:
+        return None
+    return language
@@ -1,29 +1,44 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
 import datetime as dt
+from collections.abc import Collection, Iterable, Iterator
 from os import path
 from pathlib import Path
 from shutil import move
 from typing import Any, ClassVar
 
-from guessit import guessit  # type: ignore
-
 from mnamer.exceptions import MnamerException
 from mnamer.language import Language
 from mnamer.metadata import Metadata, MetadataEpisode, MetadataMovie
+from mnamer.nfo import sidecar_ids
+from mnamer.parse_cache import ParseCache
+from mnamer.parsing import guess, guess_input, prefetch
 from mnamer.providers import Provider
+from mnamer.scan_index import ScanIndex
 from mnamer.setting_store import SettingStore
+from mnamer.stat_cache import get_stat_cache
+from mnamer.subtitles import sniff_language
 from mnamer.types import MediaType, ProviderType
 from mnamer.utils import (
+    compile_blacklist,
+    compile_format,
     crawl_in,
+    dedupe_paths,
     filename_replace,
-    filter_blacklist,
-    filter_containers,
+    filter_candidates,
     is_subtitle,
     str_replace,
     str_sanitize,
     str_scenify,
 )
+from mnamer.xattrs import (
+    metadata_from_xattrs,
+    metadata_to_xattrs,
+    read_xattrs,
+    write_xattrs,
+)
 
 
 class Target:
@@ -35,43 +50,121 @@ class Target:
     _provider: Provider
     _has_moved: bool
     _has_renamed: bool
+    _has_match: bool
     _raw_metadata: dict[str, str]
     _parsed_metadata: Metadata
+    _parse_cache: ParseCache | None
 
     source: Path
     metadata: Metadata
 
-    def __init__(self, file_path: Path, settings: SettingStore | None = None):
+    def __init__(
+        self,
+        file_path: Path,
+        settings: SettingStore | None = None,
+        parse_cache: ParseCache | None = None,
+    ):
         self.source = file_path
         self._settings = settings or SettingStore()
+        self._parse_cache = parse_cache
         self._has_moved = False
         self._has_renamed = False
-        self._parse(file_path)
-        self._replace_before()
+        self._has_match = self._read_xattrs()
+        if not self._has_match:
+            self._parse(file_path)
+            self._replace_before()
+            self._read_sidecar_ids()
         self._override_metadata_ids()
         self._register_provider()
 
     def __str__(self) -> str:
         if isinstance(self.source, Path):
-            return str(self.source.resolve())
+            return str(get_stat_cache().resolve(self.source))
         else:
             return str(self.source)
 
     @classmethod
-    def populate_paths(cls: type[Target], settings: SettingStore) -> list[Target]:
+    def populate_paths(
+        cls: type[Target],
+        settings: SettingStore,
+        scan_index: ScanIndex | None = None,
+        file_paths: Iterable[Path] | None = None,
+        parse_cache: ParseCache | None = None,
+    ) -> list[Target]:
         """Creates a list of Target objects for media files found in paths."""
-        file_paths = crawl_in(settings.targets, settings.recurse)
-        file_paths = filter_blacklist(file_paths, settings.ignore)
-        file_paths = filter_containers(file_paths, settings.mask)
-        targets = [cls(file_path, settings) for file_path in file_paths]
-        targets = list(dict.fromkeys(targets))  # unique values
-        targets = list(filter(cls._matches_media, targets))
+        targets = list(cls.iter_paths(settings, scan_index, file_paths, parse_cache))
+        if settings.locality:
+            targets.sort(key=cls._locality_key)
         return targets
 
+    @classmethod
+    def iter_paths(
+        cls: type[Target],
+        settings: SettingStore,
+        scan_index: ScanIndex | None = None,
+        file_paths: Iterable[Path] | None = None,
+        parse_cache: ParseCache | None = None,
+    ) -> Iterator[Target]:
+        """
+        Lazily creates Target objects for media files found in paths, excluding
+        unchanged files which already have an outcome in scan_index. Paths are
+        crawled from settings unless file_paths are provided, and parse_cache
+        is used to look up and store filename parsing results.
+        """
+        # starting a pool isn't worth it for a few paths, e.g. a watched file
+        few_paths = isinstance(file_paths, Collection) and (
+            len(file_paths) < settings.jobs
+        )
+        if file_paths is None:
+            file_paths = crawl_in(
+                settings.targets,
+                settings.recurse,
+                sort=True,
+                blacklist=compile_blacklist(settings.ignore),
+                workers=settings.crawl_workers,
+            )
+        file_paths = filter_candidates(
+            file_paths, settings.mask, settings.min_size * 1024 * 1024
+        )
+        file_paths = dedupe_paths(file_paths, settings.collapse_hardlinks)
+        if scan_index:
+            file_paths = (
+                file_path
+                for file_path in file_paths
+                if not scan_index.outcome_for(file_path)
+            )
+        if settings.jobs > 1 and not few_paths:
+            parse_cache = parse_cache or ParseCache(":memory:")
+            file_paths = prefetch(file_paths, settings, parse_cache, settings.jobs)
+        for file_path in file_paths:
+            target = cls(file_path, settings, parse_cache)
+            if cls._matches_media(target):
+                yield target
+
     @classmethod
     def reset_providers(cls):
         cls._providers.clear()
 
+    @classmethod
+    def clear_provider_memos(cls):
+        for provider in cls._providers.values():
+            provider.clear_memo()
+
+    @staticmethod
+    def _locality_key(target: Target) -> tuple[str, str, str, int]:
+        """
+        Orders targets so that those resolved using the same provider queries
+        are processed back to back, while the cache for them is still warm.
+        """
+        metadata = target.metadata
+        title = getattr(metadata, "series", None) or getattr(metadata, "name", None)
+        return (
+            metadata.to_media_type().value,
+            target.provider_type.value,
+            "".join(filter(str.isalnum, (title or "").casefold())),
+            getattr(metadata, "season", None) or 0,
+        )
+
     @staticmethod
     def _matches_media(target: Target) -> bool:
         if not target._settings.media:
@@ -115,17 +208,9 @@ class Target:
         return Path(directory, filename)
 
     def _parse(self, file_path: Path):
-        path_data: dict[str, Any] = {"language": self._settings.language}
-        if is_subtitle(self.source):
-            try:
-                path_data["language"] = Language.parse(self.source.stem[-2:])
-                file_path = Path(self.source.parent, self.source.stem[:-2])
-            except MnamerException:
-                pass
-        options = {"type": self._settings.media, "language": path_data["language"]}
-        raw_data = dict(guessit(str(file_path), options))
-        if isinstance(raw_data.get("season"), list):
-            raw_data = dict(guessit(str(file_path.parts[-1]), options))
+        file_path, options = guess_input(file_path, self._settings)
+        path_data: dict[str, Any] = {"language": options["language"]}
+        raw_data = self._guess(file_path, options)
         for k, v in raw_data.items():
             if hasattr(v, "alpha3"):
                 try:
@@ -176,12 +261,24 @@ class Target:
             self.metadata.language_sub = path_data.get("subtitle_language")
         except MnamerException:
             pass
+        if is_subtitle(self.metadata.container) and not self.metadata.language_sub:
+            self.metadata.language_sub = sniff_language(self.source)
         if isinstance(self.metadata, MetadataMovie):
             self.metadata.name = path_data.get("title")
             self.metadata.year = path_data.get("year")
         elif isinstance(self.metadata, MetadataEpisode):
             self.metadata.date = path_data.get("date")
             self.metadata.episode = path_data.get("episode")
+            # multi-episode files, e.g. 'S01E01E02', are given a range, but
+            # only if it has no gaps, e.g. unlike 'S01E03.E05'
+            episodes = raw_data.get("episode")
+            if (
+                isinstance(episodes, list)
+                and all(isinstance(_, int) for _ in episodes)
+                and sorted(episodes) == list(range(min(episodes), max(episodes) + 1))
+                and max(episodes) > self.metadata.episode
+            ):
+                self.metadata.episode_last = max(episodes)
             self.metadata.season = path_data.get("season")
             self.metadata.series = path_data.get("title")
             alternative_title = path_data.get("alternative_title")
@@ -192,6 +289,47 @@ class Target:
             # if year:
             #     self.metadata.series = f"{self.metadata.series} {year}"
 
+    def _guess(self, file_path: Path, options: dict[str, Any]) -> dict[str, Any]:
+        name = str(file_path)
+        if self._parse_cache:
+            raw_data = self._parse_cache.get(name, options)
+            if raw_data is not None:
+                return raw_data
+        raw_data = guess(file_path, options)
+        if self._parse_cache:
+            self._parse_cache.set(name, options, raw_data)
+        return raw_data
+
+    def _read_xattrs(self) -> bool:
+        """Restores the match stored in the source's attributes by --xattr."""
+        if not self._settings.xattr:
+            return False
+        # id directives ask for a new lookup
+        if any(
+            getattr(self._settings, f"id_{id_type}")
+            for id_type in ("imdb", "tmdb", "tvdb", "tvmaze")
+        ):
+            return False
+        restored = metadata_from_xattrs(read_xattrs(self.source))
+        if not restored:
+            return False
+        metadata, provider_type = restored
+        media_type = metadata.to_media_type()
+        if self._settings.media not in (None, media_type):
+            return False
+        if provider_type is not self._settings.api_for(media_type):
+            return False
+        self.metadata = metadata
+        return True
+
+    def _read_sidecar_ids(self):
+        if not self._settings.nfo:
+            return
+        media_type = self.metadata.to_media_type()
+        for attr, value in sidecar_ids(self.source, media_type).items():
+            if hasattr(self.metadata, attr):
+                setattr(self.metadata, attr, value)
+
     def _override_metadata_ids(self):
         id_types = {"imdb", "tmdb", "tvdb", "tvmaze"}
         for id_type in id_types:
@@ -214,35 +352,87 @@ class Target:
     def _replace_before(self) -> None:
         if not self._settings.replace_before:
             return
-        for attr, value in vars(self.metadata).items():
+        for field in dataclasses.fields(self.metadata):
+            value = getattr(self.metadata, field.name)
             if not isinstance(value, str):
                 continue
-            if attr.startswith("_"):
-                continue
             value = str_replace(value, self._settings.replace_before)
-            setattr(self.metadata, attr, value)
+            setattr(self.metadata, field.name, value)
+
+    def is_organized(self) -> bool:
+        """
+        Checks whether the source is already named as its format would render
+        it by reading field values back from its path, e.g. to skip its query.
+        Values are only trusted, and adopted as the target's metadata, if they
+        render the source's path again.
+        """
+        format_spec = self._settings.formatting_for(self.metadata)
+        extension = ""
+        if format_spec.endswith("{extension}"):
+            format_spec = format_spec.removesuffix("{extension}").removesuffix(".")
+            extension = self.metadata.extension or ""
+        depth = format_spec.count("/") + 1
+        name = "/".join(self.source.parts[-depth:])
+        if not name.endswith(extension):
+            return False
+        match = compile_format(format_spec).fullmatch(
+            name[: len(name) - len(extension)]
+        )
+        if not match:
+            return False
+        parsed_metadata = self.metadata
+        self.metadata = copy.copy(parsed_metadata)
+        fields = {field.name for field in dataclasses.fields(self.metadata)}
+        try:
+            for key, value in match.groupdict().items():
+                if key in fields:
+                    setattr(self.metadata, key, value)
+            if self.destination.absolute() == self.source.absolute():
+                return True
+        except (MnamerException, ValueError):
+            pass
+        self.metadata = parsed_metadata
+        return False
 
     def query(self) -> list[Metadata]:
-        """Queries the target's respective media provider for metadata."""
+        """
+        Queries the target's respective media provider for metadata, unless a
+        match was restored from the source's attributes.
+        """
+        if self._has_match:
+            return [self.metadata]
         results = self._provider.search(self.metadata)
         if not results:
             return []
         seen = set()
         response = []
         for idx, result in enumerate(results, start=1):
-            if str(result) in seen:
+            key = str(result)
+            if key in seen:
                 continue
             response.append(result)
-            seen.add(str(result))
+            seen.add(key)
             if idx >= self._settings.hits:
                 break
         return response
 
     def relocate(self) -> None:
         """Performs the action of renaming and/or moving a file."""
-        destination_path = Path(self.destination).resolve()
-        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        stat_cache = get_stat_cache()
+        destination = self.destination
+        destination_path = stat_cache.resolve(destination)
+        stat_cache.mkdir(destination_path.parent)
         try:
             move(str(self.source), destination_path)
         except OSError as e:  # pragma: no cover
             raise MnamerException from e
+        finally:
+            for path in (self.source, destination, destination_path):
+                stat_cache.invalidate(path)
+        self.store_match(destination_path)
+
+    def store_match(self, file_path: Path | None = None) -> None:
+        """Stores the match in file_path, or the source, if --xattr is set."""
+        if self._settings.xattr:
+            attributes = metadata_to_xattrs(self.metadata, self.provider_type)
+            write_xattrs(file_path or self.source, attributes)
@@ -29,6 +29,12 @@ class ProviderType(Enum):
     OMDB = "omdb"
 
 
+class ScanOutcome(Enum):
+    MOVED = "moved"
+    SKIPPED = "skipped"
+    NOT_FOUND = "not found"
+
+
 class SettingType(Enum):
     DIRECTIVE = "directive"
     PARAMETER = "parameter"
@@ -3,9 +3,20 @@
 import datetime as dt
 import json
 import re
-from collections.abc import Callable, Iterator
-from os import walk
-from os.path import exists, expanduser, expandvars, getsize, splitdrive, splitext
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from os import DirEntry, scandir
+from os.path import (
+    exists,
+    expanduser,
+    expandvars,
+    getsize,
+    isfile,
+    realpath,
+    splitdrive,
+    splitext,
+)
 from pathlib import Path, PurePath
 from typing import Any
 from unicodedata import normalize
@@ -13,7 +24,14 @@ from unicodedata import normalize
 import requests_cache
 from requests.adapters import HTTPAdapter
 
-from mnamer.const import CACHE_PATH, CURRENT_YEAR, SUBTITLE_CONTAINERS
+from mnamer.const import (
+    CACHE_PATH,
+    CURRENT_YEAR,
+    FORMAT_FIELD_PATTERNS,
+    PARTIAL_CONTAINERS,
+    SUBTITLE_CONTAINERS,
+)
+from mnamer.stat_cache import get_stat_cache
 
 
 def clean_dict(target_dict: dict, whitelist=None) -> dict:
@@ -30,21 +48,119 @@ def clear_cache():
     get_session().cache.clear()
 
 
-def crawl_in(file_paths: list[Path], recurse: bool = False) -> list[Path]:
-    """Looks for files amongst or within paths provided."""
-    found_files = set()
-    for file_path in file_paths:
-        if not file_path.exists():
-            continue
-        if file_path.is_file():
-            found_files.add(Path(file_path).absolute())
-            continue
-        for root, _dirs, files in walk(file_path):
-            for file in files:
-                found_files.add(Path(root, file).absolute())
+def compile_blacklist(blacklist: list[str]) -> re.Pattern | None:
+    """Combines a collection of regex patterns into a single case-insensitive one."""
+    patterns = [f"(?:{pattern})" for pattern in blacklist if pattern]
+    if not patterns:
+        return None
+    return re.compile("|".join(patterns), re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def compile_format(format_spec: str) -> re.Pattern:
+    """
+    Compiles a format specification into a pattern matching the names it could
+    render, capturing each field's value in a group named after it, e.g.
+    '{series} - S{season:02}' matches 'Lost - S01' with series and season.
+    """
+    pattern = ""
+    position = 0
+    seen = set()
+    for mobj in re.finditer(r"{(\w+)(\[[\w:]+\])?(?::\d{1,2})?}", format_spec):
+        key, index = mobj.groups()
+        pattern += re.escape(format_spec[position : mobj.start()])
+        position = mobj.end()
+        if index or not key.isidentifier():
+            pattern += ".+?"
+        elif key in seen:
+            pattern += f"(?P={key})"
+        else:
+            pattern += f"(?P<{key}>{FORMAT_FIELD_PATTERNS.get(key, '.+?')})"
+            seen.add(key)
+    pattern += re.escape(format_spec[position:])
+    return re.compile(pattern)
+
+
+def crawl_in(
+    file_paths: list[Path],
+    recurse: bool = False,
+    sort: bool = False,
+    blacklist: re.Pattern | None = None,
+    workers: int = 1,
+) -> Iterator[Path]:
+    """
+    Lazily yields files amongst or within paths provided.
+
+    Directories are listed using os.scandir so that each entry's cached type
+    information can be reused rather than stat'ing every path. When sort is set
+    entries are yielded in name order within each directory. Files and
+    directories matching blacklist are skipped, the latter without descending.
+
+    When workers is greater than one, upcoming directory listings are fetched
+    ahead of time using a thread pool of that size; this helps on high-latency
+    network filesystems and yields the same paths in the same order.
+    """
+    stat_cache = get_stat_cache()
+    roots = dict.fromkeys(Path(file_path).absolute() for file_path in file_paths)
+    pending: list[list] = [[str(root), None] for root in reversed(roots)]
+    executor = ThreadPoolExecutor(workers) if workers > 1 else None
+    try:
+        while pending:
+            if executor:
+                for item in pending[-workers * 2 :]:
+                    if not item[1]:
+                        item[1] = executor.submit(_scan_directory, item[0], sort)
+            path, future = pending.pop()
+            listing = future.result() if future else _scan_directory(path, sort)
+            if listing is None:  # path is a file
+                if not (blacklist and blacklist.search(path)):
+                    yield Path(path)
+                continue
+            files, directories = listing
+            for entry in files:
+                if blacklist and blacklist.search(entry.path):
+                    continue
+                stat_cache.seed(entry)
+                yield Path(entry.path)
             if not recurse:
-                break
-    return sorted(found_files)
+                continue
+            for entry in reversed(directories):
+                if blacklist and blacklist.search(entry.path):
+                    continue
+                pending.append([entry.path, None])
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def _scan_directory(
+    directory: str, sort: bool
+) -> tuple[list[DirEntry], list[DirEntry]] | None:
+    """
+    Lists a directory's entries, partitioned into files and subdirectories.
+    Returns None if directory is actually a file.
+    """
+    files = []
+    directories = []
+    try:
+        with scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry)
+                elif not entry.is_symlink():  # same as os.walk's followlinks=False
+                    directories.append(entry)
+    except NotADirectoryError:
+        return None if isfile(directory) else ([], [])
+    except OSError:
+        pass  # e.g. missing or permission denied; os.walk also skips these
+    if sort:
+        files.sort(key=lambda entry: entry.name)
+        directories.sort(key=lambda entry: entry.name)
+    return files, directories
 
 
 def crawl_out(filename: str | Path | PurePath) -> Path | None:
@@ -62,6 +178,37 @@ def crawl_out(filename: str | Path | PurePath) -> Path | None:
     return target if target.exists() else None
 
 
+def dedupe_paths(file_paths: Iterable[Path], hardlinks: bool = False) -> Iterator[Path]:
+    """
+    Lazily yields paths, skipping those referring to a file already yielded,
+    e.g. by way of overlapping directories or symlinks. Hard links to the same
+    file are only treated as duplicates when hardlinks is set.
+    """
+    stat_cache = get_stat_cache()
+    seen: dict[tuple[int, int], str] = {}
+    resolved: dict[tuple[int, int], set[str]] = {}
+    for file_path in file_paths:
+        st = stat_cache.stat(file_path)
+        if st is None:
+            yield file_path
+            continue
+        key = (st.st_dev, st.st_ino)
+        path = str(file_path)
+        if key not in seen:
+            seen[key] = path
+            yield file_path
+            continue
+        if hardlinks or path == seen[key]:
+            continue
+        # same inode; only a duplicate if both resolve to the same location
+        real_paths = resolved.setdefault(key, {realpath(seen[key])})
+        real_path = realpath(path)
+        if real_path in real_paths:
+            continue
+        real_paths.add(real_path)
+        yield file_path
+
+
 def filename_replace(filename: str, replacements: dict[str, str]) -> str:
     """Replaces keys in replacements dict with their values."""
     base, container = splitext(filename)
@@ -69,37 +216,30 @@ def filename_replace(filename: str, replacements: dict[str, str]) -> str:
     return base + container
 
 
-def filter_blacklist(paths: list[Path], blacklist: list[str]) -> list[Path]:
-    """Filters (set difference) paths by a collection of regex patterns."""
-    return [
-        path.absolute()
-        for path in paths
-        if not any(
-            re.search(pattern, str(path), re.IGNORECASE)
-            for pattern in blacklist
-            if pattern
-        )
-    ]
-
-
-def filter_containers(
-    file_paths: list[Path], valid_containers: list[str]
-) -> list[Path]:
-    """Filters (set intersection) a collection of containers."""
+def filter_candidates(
+    file_paths: Iterable[Path], valid_containers: list[str], min_size: int = 0
+) -> Iterator[Path]:
+    """
+    Lazily filters out paths which can't be media, i.e. hidden files, partial
+    downloads, invalid containers and, subtitles aside, files smaller than
+    min_size bytes. Only names and cached stats are used, so it's cheap enough
+    to run before parsing.
+    """
     valid_containers = normalize_containers(valid_containers)
-    return [
-        file_path
-        for file_path in file_paths
-        if not valid_containers or file_path.suffix.lower() in valid_containers
-    ]
-
-
-def findall(s, ss) -> Iterator[int]:
-    """Yields indexes of all start positions of substring matches in string."""
-    i = s.find(ss)
-    while i != -1:
-        yield i
-        i = s.find(ss, i + 1)
+    stat_cache = get_stat_cache()
+    for file_path in file_paths:
+        if file_path.name.startswith("."):
+            continue
+        container = file_path.suffix.lower()
+        if container in PARTIAL_CONTAINERS:
+            continue
+        if valid_containers and container not in valid_containers:
+            continue
+        if min_size and not is_subtitle(container):
+            st = stat_cache.stat(file_path)
+            if st is None or st.st_size < min_size:
+                continue
+        yield file_path
 
 
 def fn_chain(*fn_list: Callable) -> Callable:
@@ -167,7 +307,8 @@ def get_session() -> requests_cache.CachedSession:
 
 def get_filesize(path: Path) -> str:
     """Returns the human-readable filesize for a given path."""
-    size = float(getsize(path))
+    st = get_stat_cache().stat(path)
+    size = float(getsize(path) if st is None else st.st_size)
     units = ["B", "KB", "MB", "GB", "TB"]
     for i, unit in enumerate(units):
         if size < 1024.0 or i == len(units) - 1:
@@ -277,24 +418,26 @@ def request_json(
     return status, (content or {})
 
 
+_EMPTY_BRACKETS_PATTERN = re.compile(r"\(\s*\)|\[\s*]")
+_DASHES_PATTERN = re.compile(r"-+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_DELIMITERS_PATTERN = re.compile(r"( [-.,_])+")
+
+
 def str_fix_padding(s: str) -> str:
     """Truncates and collapses whitespace and delimiters in strings."""
-    len_before = len(s)
-    # Remove empty brackets
-    s = re.sub(r"\(\s*\)", "", s)
-    s = re.sub(r"\[\s*]", "", s)
+    # Remove empty brackets, including those left empty by removing others
+    removed = 1
+    while removed:
+        s, removed = _EMPTY_BRACKETS_PATTERN.subn("", s)
     # Collapse dashes
-    s = re.sub(r"-+", "-", s)
+    s = _DASHES_PATTERN.sub("-", s)
     # Collapse whitespace
-    s = re.sub(r"\s+", " ", s)
+    s = _WHITESPACE_PATTERN.sub(" ", s)
     # Collapse repeating delimiters
-    s = re.sub(r"( [-.,_])+", r"\1", s)
-    # Strip leading/ trailing whitespace
-    s = s.strip()
-    # Strip leading/ trailing dashes
-    s = s.strip("-")
-    len_after = len(s)
-    return s if len_before == len_after else str_fix_padding(s)
+    s = _DELIMITERS_PATTERN.sub(r"\1", s)
+    # Strip leading/ trailing whitespace and dashes
+    return s.strip(" -")
 
 
 def str_replace(s: str, replacements: dict[str, str]) -> str:
@@ -309,6 +452,11 @@ def str_replace_slashes(s: str) -> str:
     return str_replace(s, {"/": "-", "\\": "-"})
 
 
+_SANITIZE_ILLEGAL_PATTERN = re.compile(r'[<>:"|?*&%=+@#`^]')
+_SCENIFY_ILLEGAL_PATTERN = re.compile(r"[^.\d\w/]")
+_SCENIFY_DOTS_PATTERN = re.compile(r"\.+")
+
+
 def str_sanitize(filename: str) -> str:
     """Removes illegal filename characters and condenses whitespace."""
     base, container = splitext(filename)
@@ -316,29 +464,24 @@ def str_sanitize(filename: str) -> str:
         base = base.rstrip(".")
         base, container_prefix = splitext(base)
         container = container_prefix + container
-    base = re.sub(r"\s+", " ", base)
+    base = _WHITESPACE_PATTERN.sub(" ", base)
     drive, tail = splitdrive(base)
-    tail = re.sub(r'[<>:"|?*&%=+@#`^]', "", tail)
+    tail = _SANITIZE_ILLEGAL_PATTERN.sub("", tail)
     return drive + tail.strip("-., ") + container
 
 
 def str_scenify(filename: str) -> str:
     """Replaces non ascii-alphanumerics with dots."""
     filename = normalize("NFKD", filename)
-    filename.encode("ascii", "ignore")
-    filename = re.sub(r"\s+", ".", filename)
-    filename = re.sub(r"[^.\d\w/]", "", filename)
-    filename = re.sub(r"\.+", ".", filename)
+    filename = _WHITESPACE_PATTERN.sub(".", filename)
+    filename = _SCENIFY_ILLEGAL_PATTERN.sub("", filename)
+    filename = _SCENIFY_DOTS_PATTERN.sub(".", filename)
     return filename.lower().strip(".")
 
 
-def str_title_case(s: str) -> str:
-    """Attempts to intelligently apply title case transformations to strings."""
-
-    if not s:
-        return s
-
-    lowercase_exceptions = {
+# words which are lowercased, except at the start or end of strings
+TITLE_CASE_LOWERCASE = frozenset(
+    {
         "a",
         "an",
         "and",
@@ -365,7 +508,11 @@ def str_title_case(s: str) -> str:
         "with",
         "via",
     }
-    uppercase_exceptions = {
+)
+
+# words which are uppercased wherever they appear, e.g. roman numerals
+TITLE_CASE_UPPERCASE = frozenset(
+    {
         "i",
         "ii",
         "iii",
@@ -418,64 +565,48 @@ def str_title_case(s: str) -> str:
         "xxx",
         "yolo",
     }
-    padding_chars = ".- "
-    paren_chars = "[](){}<>{}"
-    punctuation_chars = paren_chars + "\"!?$,-.:;@_`'"
-    partition_chars: str = padding_chars + punctuation_chars
-    string_lower = s.lower()
-    string_length = len(s)
-
-    # uppercase first character
-    s = s.lower()
-    s = s[0].upper() + s[1:]
-
-    # uppercase characters after padding characters
-    for char in padding_chars:
-        for pos in findall(s, char):
-            if pos + 1 == string_length:
-                break
-            elif pos + 2 < string_length:
-                s = s[: pos + 1] + s[pos + 1].upper() + s[pos + 2 :]
-            else:
-                s = s[: pos + 1] + s[pos + 1].upper()
-
-    # uppercase characters inside parentheses
-    for char in paren_chars:
-        for pos in findall(s, char):
-            if pos > 0 and s[pos - 1] not in padding_chars:
-                continue
-            elif pos + 1 < string_length:
-                s = s[: pos + 1] + s[pos + 1].upper() + s[pos + 2 :]
-
-    # process lowercase transformations
-    for exception in lowercase_exceptions:
-        for pos in findall(string_lower, exception):
-            is_start = pos < 2
-            if is_start:
-                break
-            prev_char = string_lower[pos - 1]
-            is_left_partitioned = prev_char in padding_chars
-            word_length = len(exception)
-            ends = pos + word_length == string_length
-            next_char = "" if ends else string_lower[pos + word_length]
-            is_right_partitioned = not ends and next_char in padding_chars
-            if is_left_partitioned and is_right_partitioned:
-                s = s[:pos] + exception.lower() + s[pos + word_length :]
-
-    # process uppercase transformations
-    for exception in uppercase_exceptions:
-        for pos in findall(string_lower, exception):
-            is_start = pos == 0
-            prev_char = None if is_start else string_lower[pos - 1]  # type: ignore
-            is_left_partitioned = is_start or prev_char in partition_chars  # type: ignore
-            word_length = len(exception)
-            ends = pos + word_length == string_length
-            next_char = "" if ends else string_lower[pos + word_length]
-            is_right_partitioned = ends or next_char in partition_chars
-            if is_left_partitioned and is_right_partitioned:
-                s = s[:pos] + exception.upper() + s[pos + word_length :]
+)
 
-    return s
+_TITLE_CASE_PARENS = "[](){}<>"
+_TITLE_CASE_PADDING_PATTERN = re.compile(r"([.\- ])")
+_TITLE_CASE_PUNCTUATION_PATTERN = re.compile(r"[\[\](){}<>\"!?$,:;@_`']")
+_TITLE_CASE_TOKEN_PATTERN = re.compile(r"[^\[\](){}<>\"!?$,:;@_`']+")
+
+
+def _title_case_token(mobj: re.Match) -> str:
+    token = mobj.group()
+    return token.upper() if token.lower() in TITLE_CASE_UPPERCASE else token
+
+
+@lru_cache(maxsize=4096)
+def str_title_case(s: str) -> str:
+    """Attempts to intelligently apply title case transformations to strings."""
+    if not s:
+        return s
+    lower = s.lower()
+    # words and the padding characters between them, in alternation
+    parts = _TITLE_CASE_PADDING_PATTERN.split(lower)
+    last = len(parts) - 1
+    for idx in range(0, len(parts), 2):
+        word = parts[idx]
+        if not word:
+            continue
+        # lowercase exceptions stay lowercase, except at the start or end, or
+        # if they also appear within the first two characters
+        if 0 < idx < last and word in TITLE_CASE_LOWERCASE and lower.find(word) >= 2:
+            continue
+        # uppercase the first letter, including after an opening parenthesis
+        if word[0] in _TITLE_CASE_PARENS and len(word) > 1:
+            word = word[0] + word[1].upper() + word[2:]
+        else:
+            word = word[0].upper() + word[1:]
+        # uppercase exceptions are also partitioned by punctuation
+        if word.lower() in TITLE_CASE_UPPERCASE:
+            word = word.upper()
+        elif _TITLE_CASE_PUNCTUATION_PATTERN.search(word):
+            word = _TITLE_CASE_TOKEN_PATTERN.sub(_title_case_token, word)
+        parts[idx] = word
+    return "".join(parts)
 
 
 def year_parse(s: str) -> int | None:
@@ -0,0 +1,199 @@
+"""Watches directories for newly written media files using Linux's inotify."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from select import select
+
+from mnamer.exceptions import MnamerException
+from mnamer.utils import crawl_in
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_libc() -> ctypes.CDLL:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1  # noqa: B018
+    except (AttributeError, OSError):
+        raise MnamerException("--watch requires Linux inotify support") from None
+    return libc
+
+
+class Watcher:
+    """
+    Yields files within watched directories once they have been completely
+    written. A file is considered complete after a close-after-write or a move
+    into a watched directory, followed by debounce seconds of no further events
+    and no change in its size. If events are lost because inotify's queue
+    overflowed, the watched directories are scanned again instead.
+    """
+
+    def __init__(
+        self,
+        directories: list[Path],
+        recurse: bool = False,
+        blacklist: re.Pattern | None = None,
+        debounce: float = 2.0,
+    ):
+        self._roots = [
+            str(directory.absolute()) for directory in directories if directory.is_dir()
+        ]
+        if not self._roots:
+            raise MnamerException("--watch requires a directory target")
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise MnamerException(os.strerror(ctypes.get_errno()))
+        self._recurse = recurse
+        self._blacklist = blacklist
+        self._debounce = debounce
+        self._directories: dict[int, str] = {}
+        self._pending: dict[str, tuple[float, int]] = {}  # path -> (due, size)
+        for root in self._roots:
+            self._add_watch(root)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __iter__(self) -> Iterator[Path]:
+        while True:
+            yield from self.poll(None)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def poll(self, timeout: float | None) -> list[Path]:
+        """
+        Waits up to timeout seconds (or indefinitely if None) for files to
+        settle, returning those that did.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            ready = self._settle(now)
+            if ready:
+                return ready
+            if deadline is not None and now >= deadline:
+                return []
+            waits = [due - now for due, _ in self._pending.values()]
+            if deadline is not None:
+                waits.append(deadline - now)
+            wait = max(min(waits), 0) if waits else None
+            if select([self._fd], [], [], wait)[0]:
+                self._read_events()
+
+    def _add_watch(self, directory: str) -> None:
+        if self._blacklist and self._blacklist.search(directory):
+            return
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO
+        if self._recurse:
+            mask |= IN_CREATE
+        wd = self._libc.inotify_add_watch(self._fd, directory.encode(), mask)
+        if wd < 0:
+            if ctypes.get_errno() == errno.ENOSPC:
+                raise MnamerException("inotify watch limit reached")
+            return  # e.g. removed before it could be watched or permission denied
+        self._directories[wd] = directory
+        if not self._recurse:
+            return
+        try:
+            with os.scandir(directory) as entries:
+                subdirectories = [
+                    entry.path
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                ]
+        except OSError:
+            return
+        for subdirectory in subdirectories:
+            self._add_watch(subdirectory)
+
+    def _queue(self, path: str) -> None:
+        if self._blacklist and self._blacklist.search(path):
+            return
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        self._pending[path] = (time.monotonic() + self._debounce, size)
+
+    def _read_events(self) -> None:
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = (
+                buffer[offset : offset + length]
+                .rstrip(b"\0")
+                .decode(errors="surrogateescape")
+            )
+            offset += length
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            if mask & IN_Q_OVERFLOW:
+                self._rescan()
+                continue
+            directory = self._directories.get(wd)
+            if not directory or not name:
+                continue
+            path = os.path.join(directory, name)
+            if not mask & IN_ISDIR:
+                self._queue(path)
+            elif self._recurse:
+                # files may have been written before the watch was in place
+                self._add_watch(path)
+                for file_path in crawl_in(
+                    [Path(path)], True, blacklist=self._blacklist
+                ):
+                    self._queue(str(file_path))
+
+    def _rescan(self) -> None:
+        for root in self._roots:
+            if self._recurse:
+                self._add_watch(root)  # directories may have been created too
+            for file_path in crawl_in(
+                [Path(root)], self._recurse, blacklist=self._blacklist
+            ):
+                self._queue(str(file_path))
+
+    def _settle(self, now: float) -> list[Path]:
+        ready = []
+        for path, (due, size) in list(self._pending.items()):
+            if due > now:
+                continue
+            try:
+                current_size = os.stat(path).st_size
+            except OSError:
+                del self._pending[path]
+                continue
+            if current_size == size:
+                del self._pending[path]
+                ready.append(Path(path))
+            else:
+                self._pending[path] = (now + self._debounce, current_size)
+        return sorted(ready)
@@ -0,0 +1,110 @@
+"""Remembers matches in extended file attributes so they survive relocation."""
+
+import dataclasses
+import json
+import os
+from collections.abc import Callable
+from os import PathLike
+from typing import Any
+
+from mnamer.exceptions import MnamerException
+from mnamer.language import Language
+from mnamer.metadata import Metadata, MetadataEpisode, MetadataMovie
+from mnamer.types import MediaType, ProviderType
+from mnamer.utils import parse_date
+
+# matches are stored as a single json object so that they are written at once
+XATTR_NAME = "user.mnamer.match"
+
+# fields which aren't stored as they are, and how they are read back
+XATTR_DECODERS: dict[str, Callable[[str], Any]] = {
+    "date": parse_date,
+    "episode": int,
+    "episode_last": int,
+    "language": Language.parse,
+    "language_sub": Language.parse,
+    "season": int,
+    "year": int,
+}
+
+XATTR_SUPPORTED = hasattr(os, "getxattr")
+
+
+def read_xattrs(path: str | PathLike) -> dict[str, str]:
+    """Returns a file's mnamer attributes, if any."""
+    if not XATTR_SUPPORTED:
+        return {}
+    try:
+        attributes = json.loads(os.getxattr(path, XATTR_NAME))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(attributes, dict) or not all(
+        isinstance(value, str) for value in attributes.values()
+    ):
+        return {}
+    return attributes
+
+
+def write_xattrs(path: str | PathLike, attributes: dict[str, str]) -> bool:
+    """
+    Replaces a file's mnamer attributes, returning False if the platform or
+    file system doesn't support them, in which case any previous ones are
+    removed.
+    """
+    if not XATTR_SUPPORTED:
+        return False
+    try:
+        os.setxattr(path, XATTR_NAME, json.dumps(attributes).encode())
+    except OSError:
+        try:
+            os.removexattr(path, XATTR_NAME)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def metadata_to_xattrs(metadata: Metadata, provider: ProviderType) -> dict[str, str]:
+    """Serializes a match and the provider it came from into attributes."""
+    attributes = {
+        "media": metadata.to_media_type().value,
+        "provider": provider.value,
+    }
+    for field in dataclasses.fields(metadata):
+        value = getattr(metadata, field.name)
+        if value is None:
+            continue
+        elif isinstance(value, Language):
+            attributes[field.name] = value.a3
+        elif hasattr(value, "isoformat"):
+            attributes[field.name] = value.isoformat()
+        else:
+            attributes[field.name] = str(value)
+    return attributes
+
+
+def metadata_from_xattrs(
+    attributes: dict[str, str],
+) -> tuple[Metadata, ProviderType] | None:
+    """Deserializes a match and its provider, or returns None if incomplete."""
+    try:
+        media = MediaType(attributes["media"])
+        provider = ProviderType(attributes["provider"])
+    except (KeyError, ValueError):
+        return None
+    metadata = {
+        MediaType.EPISODE: MetadataEpisode,
+        MediaType.MOVIE: MetadataMovie,
+    }[media]()
+    for field in dataclasses.fields(metadata):
+        value = attributes.get(field.name)
+        if value is None:
+            continue
+        decoder = XATTR_DECODERS.get(field.name)
+        try:
+            decoded = decoder(value) if decoder else value
+        except (MnamerException, ValueError):
+            return None
+        # stored values are already converted, so setters are bypassed
+        object.__setattr__(metadata, field.name, decoded)
+    return metadata, provider
@@ -7,8 +7,10 @@ from mnamer.types import ProviderType
 
 DEFAULT_SETTINGS = {
     "batch": False,
+    "collapse_hardlinks": False,
     "config_dump": False,
     "config_ignore": False,
+    "crawl_workers": 1,
     "episode_api": ProviderType.TVMAZE,
     "episode_directory": None,
     "episode_format": "{series} - S{season:02}E{episode:02} - {title}.{extension}",
@@ -18,9 +20,14 @@ DEFAULT_SETTINGS = {
     "id_tvdb": None,
     "id_tvmaze": None,
     "ignore": [".*sample.*", "^RARBG.*"],
+    "incremental": False,
+    "jobs": 1,
+    "locality": False,
     "lower": False,
     "mask": [".avi", ".m4v", ".mp4", ".mkv", ".ts", ".wmv"] + SUBTITLE_CONTAINERS,
     "media": None,
+    "min_size": 0,
+    "nfo": False,
     "movie_api": ProviderType.TMDB,
     "movie_directory": None,
     "movie_format": "{name} ({year}).{extension}",
@@ -32,10 +39,14 @@ DEFAULT_SETTINGS = {
     "replace_after": {"&": "and", ";": ",", "@": "at"},
     "replace_before": {},
     "scene": False,
+    "skip_organized": False,
+    "stream": False,
     "targets": [],
     "test": False,
     "verbose": False,
     "version": False,
+    "watch": False,
+    "xattr": False,
 }
 
 
@@ -5,15 +5,19 @@ from shutil import rmtree
 
 import pytest
 
+from mnamer.stat_cache import get_stat_cache
+
 
 @pytest.fixture
 def setup_test_dir(request):
     orig_dir = os.getcwd()
     tmp_dir = tempfile.mkdtemp()
     os.chdir(tmp_dir)
+    get_stat_cache().clear()
 
     def finalizer():
         os.chdir(orig_dir)
+        get_stat_cache().clear()
         rmtree(tmp_dir)
 
     request.addfinalizer(finalizer)
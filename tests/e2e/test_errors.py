@@ -40,3 +40,11 @@ def test_no_files_found(e2e_run, setup_test_files):
     result = e2e_run(JUNK_TEXT)
     assert result.code == 0
     assert "no media files found" in result.out
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_no_files_found__stream(e2e_run, setup_test_files):
+    setup_test_files("scan001.tiff")
+    result = e2e_run("--stream", ".")
+    assert result.code == 0
+    assert "no media files found" in result.out
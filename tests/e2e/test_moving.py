@@ -52,6 +52,15 @@ def test_scene(e2e_run, setup_test_files):
     assert "aladdin.2019.avi" in result.out
 
 
+@pytest.mark.usefixtures("setup_test_dir")
+def test_stream(e2e_run, setup_test_files):
+    setup_test_files("aladdin.2019.avi", "kill.bill.2003.ts", "homework.txt")
+    result = e2e_run("--batch", "--stream", ".")
+    assert result.code == 0
+    assert result.out.index("aladdin") < result.out.index("kill.bill")
+    assert "2 out of 2 files processed successfully" in result.out
+
+
 @pytest.mark.usefixtures("setup_test_dir")
 def test_no_guess(e2e_run, setup_test_files):
     setup_test_files(
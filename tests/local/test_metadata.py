@@ -2,7 +2,13 @@ import datetime as dt
 
 import pytest
 
-from mnamer.metadata import Metadata, MetadataEpisode, MetadataMovie
+from mnamer.language import Language
+from mnamer.metadata import (
+    Metadata,
+    MetadataEpisode,
+    MetadataMovie,
+    _format_template,
+)
 
 pytestmark = pytest.mark.local
 
@@ -60,6 +66,15 @@ def test_metadata_episode__convert_episode():
     assert metadata.episode == 1
 
 
+@pytest.mark.parametrize(
+    ("episode", "episode_last", "expected"),
+    ((None, None, "S04E"), (4, None, "S04E04"), (4, 4, "S04E04"), (4, 5, "S04E04-05")),
+)
+def test_metadata_episode__format_episode_range(episode, episode_last, expected):
+    metadata = MetadataEpisode(season=4, episode=episode, episode_last=episode_last)
+    assert format(metadata, "S{season:02}E{episode_range}") == expected
+
+
 def test_metadata_episode__format_default():
     metadata = MetadataEpisode(series="Spongebob Squarepants", season=4, episode=4)
     actual = format(metadata)
@@ -123,3 +138,45 @@ def test_metadata_movie__format_with_specifiers():
     expected = "P/Pineapple Express"
     actual = format(metadata, format_spec)
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ("format_spec", "expected"),
+    (
+        ("{name} [{language[a2]}]", "Heat [en]"),
+        ("{name} {{year}} {name!r} {unknown}", "Heat {} {name!r}"),
+        ("{name} {update} {format_keys}", "Heat"),
+        ("{extension}", ".mkv"),
+    ),
+)
+def test_metadata_movie__format_fields(format_spec: str, expected: str):
+    metadata = MetadataMovie(
+        name="heat", language=Language.parse("en"), container="mkv"
+    )
+    assert format(metadata, format_spec) == expected
+
+
+def test_metadata__format_template_reused():
+    format_spec = "{name} ({year}) {quality}"
+    for name in ("heat", "ran"):
+        format(MetadataMovie(name=name), format_spec)
+    template = _format_template(format_spec)
+    assert _format_template(format_spec) is template
+    assert format(MetadataMovie(name="heat", quality="1080p"), format_spec) == (
+        "Heat 1080p"
+    )
+
+
+def test_metadata__slots():
+    metadata = MetadataEpisode()
+    assert not hasattr(metadata, "__dict__")
+    with pytest.raises(AttributeError):
+        metadata.name = "Heat"  # type: ignore
+
+
+def test_metadata__update():
+    metadata = MetadataEpisode(series="lost", season=1, title="pilot")
+    metadata.update(MetadataEpisode(season=2, episode=3, synopsis="plane. crash"))
+    assert metadata == MetadataEpisode(
+        series="Lost", season=2, episode=3, title="Pilot", synopsis="Plane. crash"
+    )
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import pytest
+
+from mnamer.nfo import read_ids, sidecar_ids
+from mnamer.types import MediaType
+
+pytestmark = pytest.mark.local
+
+MOVIE_NFO = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<movie>
+    <title>The Matrix</title>
+    <uniqueid type="imdb" default="true">tt0133093</uniqueid>
+    <uniqueid type="tmdb">603</uniqueid>
+    <actor><name>Keanu Reeves</name><tmdbid>6384</tmdbid></actor>
+</movie>
+"""
+
+TVSHOW_NFO = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<tvshow>
+    <title>Lost</title>
+    <uniqueid type="tvdb" default="true">73739</uniqueid>
+    <uniqueid type="tvmaze">123</uniqueid>
+</tvshow>
+"""
+
+
+@pytest.fixture
+def write_nfo():
+    def fn(path: str, text: str) -> Path:
+        nfo_path = Path(*path.split("/"))
+        nfo_path.parent.mkdir(parents=True, exist_ok=True)
+        nfo_path.write_text(text)
+        return nfo_path
+
+    read_ids.cache_clear()
+    return fn
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("name", ("The Matrix (1999).nfo", "movie.nfo"))
+def test_sidecar_ids__movie(write_nfo, name: str):
+    write_nfo(f"The Matrix (1999)/{name}", MOVIE_NFO)
+    file_path = Path("The Matrix (1999)", "The Matrix (1999).mkv")
+    assert sidecar_ids(file_path, MediaType.MOVIE) == {
+        "id_imdb": "tt0133093",
+        "id_tmdb": "603",
+    }
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_sidecar_ids__movie_nfo__several_movies(write_nfo, setup_test_files):
+    setup_test_files("Movies/The Matrix (1999).mkv", "Movies/Heat (1995).avi")
+    write_nfo("Movies/movie.nfo", MOVIE_NFO)
+    file_path = Path("Movies", "Heat (1995).avi")
+    assert sidecar_ids(file_path, MediaType.MOVIE) == {}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("directory", ("Lost", "Lost/Season 1"))
+def test_sidecar_ids__episode(write_nfo, directory: str):
+    write_nfo("Lost/tvshow.nfo", TVSHOW_NFO)
+    file_path = Path(directory, "Lost.S01E01.mkv")
+    assert sidecar_ids(file_path, MediaType.EPISODE) == {
+        "id_tvdb": "73739",
+        "id_tvmaze": "123",
+    }
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_sidecar_ids__episode_nfo(write_nfo):
+    write_nfo(
+        "Lost/Lost.S01E01.nfo",
+        '<episodedetails><uniqueid type="tvdb">127131</uniqueid></episodedetails>',
+    )
+    file_path = Path("Lost", "Lost.S01E01.mkv")
+    assert sidecar_ids(file_path, MediaType.EPISODE) == {}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_sidecar_ids__missing():
+    file_path = Path("The Matrix (1999)", "The Matrix (1999).mkv")
+    assert sidecar_ids(file_path, MediaType.MOVIE) == {}
+    assert sidecar_ids(file_path, None) == {}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize(
+    "text",
+    (
+        "https://www.imdb.com/title/tt0133093/",
+        "<movie><title>The Matrix</title></movie>\nhttps://www.imdb.com/title/tt0133093/",
+        "<movie><id>tt0133093</id></movie>",
+        "<movie><imdbid>tt0133093</imdbid></movie>",
+        "<movie>broken",
+    ),
+)
+def test_read_ids__formats(write_nfo, text: str):
+    nfo_path = write_nfo("movie.nfo", text)
+    expected = {} if text == "<movie>broken" else {"id_imdb": "tt0133093"}
+    assert read_ids(nfo_path, "movie") == expected
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_read_ids__invalid(write_nfo):
+    nfo_path = write_nfo(
+        "movie.nfo", '<movie><uniqueid type="imdb">junk</uniqueid></movie>'
+    )
+    assert read_ids(nfo_path, "movie") == {}
@@ -0,0 +1,73 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mnamer.language import Language
+from mnamer.parse_cache import ParseCache
+from mnamer.setting_store import SettingStore
+from mnamer.target import Target
+from mnamer.types import MediaType
+
+pytestmark = pytest.mark.local
+
+EPISODE_OPTIONS = {"type": MediaType.EPISODE, "language": None}
+
+
+@pytest.fixture
+def parse_cache(tmp_path: Path):
+    cache = ParseCache(tmp_path / "parse.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_get__unknown(parse_cache: ParseCache):
+    assert parse_cache.get("a.mkv", EPISODE_OPTIONS) is None
+
+
+def test_set(parse_cache: ParseCache):
+    parse_cache.set("a.mkv", EPISODE_OPTIONS, {"title": "a", "season": 1})
+    assert parse_cache.get("a.mkv", EPISODE_OPTIONS) == {"title": "a", "season": 1}
+
+
+@pytest.mark.parametrize(
+    "options",
+    (
+        {"type": MediaType.MOVIE, "language": None},
+        {"type": MediaType.EPISODE, "language": Language.parse("fr")},
+        {"type": None, "language": None},
+    ),
+)
+def test_set__keyed_by_options(parse_cache: ParseCache, options):
+    parse_cache.set("a.mkv", EPISODE_OPTIONS, {"title": "a"})
+    assert parse_cache.get("a.mkv", options) is None
+
+
+def test_set__keyed_by_version(parse_cache: ParseCache):
+    parse_cache.set("a.mkv", EPISODE_OPTIONS, {"title": "a"})
+    with patch("mnamer.parse_cache.guessit_version", "0.0.0"):
+        assert parse_cache.get("a.mkv", EPISODE_OPTIONS) is None
+
+
+def test_set__persists(tmp_path: Path):
+    cache = ParseCache(tmp_path / "parse.sqlite")
+    cache.set("a.mkv", EPISODE_OPTIONS, {"title": "a"})
+    cache.close()
+    cache = ParseCache(tmp_path / "parse.sqlite")
+    assert cache.get("a.mkv", EPISODE_OPTIONS) == {"title": "a"}
+    cache.close()
+
+
+def test_clear(parse_cache: ParseCache):
+    parse_cache.set("a.mkv", EPISODE_OPTIONS, {"title": "a"})
+    parse_cache.clear()
+    assert parse_cache.get("a.mkv", EPISODE_OPTIONS) is None
+
+
+def test_target__skips_guessit(parse_cache: ParseCache):
+    file_path = Path("ninja.turtles.s01e04.1080p.ac3.rargb.mkv")
+    expected = Target(file_path, SettingStore(), parse_cache).metadata
+    with patch("mnamer.parsing.guessit") as mock_guessit:
+        actual = Target(file_path, SettingStore(), parse_cache).metadata
+    mock_guessit.assert_not_called()
+    assert actual == expected
@@ -0,0 +1,297 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from guessit import guessit  # type: ignore
+
+from mnamer.language import Language
+from mnamer.parse_cache import ParseCache
+from mnamer.parsing import (
+    SEASON_PACK_PATTERN,
+    _guessit,
+    _siblings,
+    fast_guess,
+    fast_path_counts,
+    guess,
+    guess_input,
+    prefetch,
+    sibling_guess,
+)
+from mnamer.setting_store import SettingStore
+from mnamer.target import Target
+from mnamer.types import MediaType
+
+pytestmark = pytest.mark.local
+
+FILENAMES = (
+    "aladdin.1992.avi",
+    "game.of.thrones.01x05-eztv.mp4",
+    "ninja.turtles.s01e04.1080p.ac3.rargb.mkv",
+    "Planet Earth II S01E06 - Cities (2016) (2160p).mp4",
+    "s.w.a.t.2017.s02e01.mkv",
+    "The.Walking.Dead.S05E03.720p.HDTV.x264-ASAP[ettv].mkv",
+)
+
+FAST_PATH_FILENAMES = (
+    "Breaking.Bad.S02E01.720p.WEB-DL.AAC-NTb.mkv",
+    "Dark.S01E01.1080p.WEB.x264-GRP.mkv",
+    "Game.of.Thrones.S01E05.1080p.BluRay.x264-ROVERS.mkv",
+    "Inception.2010.1080p.BluRay.x264-AMIABLE.mkv",
+    "Parasite.2019.2160p.WEB.x265-GRP.mkv",
+    "Sherlock.S04E01.HDTV.x264-DEADPOOL.mp4",
+    "The.Walking.Dead.S05E03.720p.HDTV.x264-ASAP.mkv",
+    "downloads/Friends.S01E01.576p.XviD.AC3-PSYCHD.avi",
+    "/home/user/Downloads/Arrival.2016.h264.mkv",
+)
+
+
+SEASON_DIRECTORY = Path("Show Name (2019)", "Season 1")
+
+
+@pytest.fixture(autouse=True)
+def clear_siblings():
+    _siblings.clear()
+
+
+@pytest.fixture
+def parse_cache(tmp_path: Path):
+    cache = ParseCache(tmp_path / "parse.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_guess():
+    raw_data = guess(Path("ninja.turtles.s01e04.mkv"), {})
+    assert raw_data["title"] == "ninja turtles"
+    assert raw_data["season"] == 1
+    assert raw_data["episode"] == 4
+
+
+def test_guess__multiple_seasons():
+    file_path = Path("Lost Seasons 1-2", "Lost.S02E01.mkv")
+    assert guess(file_path, {})["season"] == 2
+
+
+@pytest.mark.parametrize(
+    "directory",
+    (
+        "Friends S01-S10",
+        "Lost Seasons 1-2",
+        "Show (2005) Seasons 1, 2, 3",
+        "Show Season 1 & 2",
+        "Show.S01.S02.720p",
+        "TV/Show/Season 1-3",
+    ),
+)
+def test_guess__season_pack(directory: str):
+    file_path = Path(directory, "Show.E04.mkv")
+    with patch("mnamer.parsing.guessit", wraps=guessit) as mock_guessit:
+        raw_data = guess(file_path, {})
+    mock_guessit.assert_called_once()
+    assert "season" not in raw_data
+    assert raw_data["episode"] == 4
+
+
+@pytest.mark.parametrize(
+    "filename,title,season,episode",
+    (
+        ("Lost.S02E01.mkv", "Lost", 2, 1),
+        ("Show_1x05_Title.mkv", "Show", 1, 5),
+        ("Show.105.Title.mkv", "Show", 1, 5),
+    ),
+)
+def test_guess__season_pack__own_season(
+    filename: str, title: str, season: int, episode: int
+):
+    file_path = Path("Lost.Seasons.1-2.720p.US", filename)
+    raw_data = guess(file_path, {})
+    assert raw_data["title"] == title
+    assert raw_data["season"] == season
+    assert raw_data["episode"] == episode
+    assert raw_data["screen_size"] == "720p"
+    assert str(raw_data["country"]) == "US"
+
+
+@pytest.mark.parametrize("directory", ("Ocean's 11 & 12", "Movies/Ocean’s 8 - 11"))
+def test_guess__not_season_pack(directory: str):
+    assert not SEASON_PACK_PATTERN.search(directory)
+
+
+def test_guess__season_pack__untitled():
+    file_path = Path("Lost Seasons 1-2", "S02E01.mkv")
+    raw_data = guess(file_path, {})
+    assert raw_data["title"] == "Lost"
+    assert raw_data["season"] == 2
+
+
+def test_guess__multiple_seasons__filename():
+    with patch("mnamer.parsing.guessit", wraps=guessit) as mock_guessit:
+        raw_data = guess(Path("Show.S01.S02.mkv"), {})
+    mock_guessit.assert_called_once()
+    assert raw_data["season"] == [1, 2]
+
+
+def test_guess__fast_path():
+    with patch("mnamer.parsing.guessit") as mock_guessit:
+        raw_data = guess(Path(FAST_PATH_FILENAMES[0]), {})
+    mock_guessit.assert_not_called()
+    assert raw_data["title"] == "Breaking Bad"
+
+
+@pytest.mark.parametrize("filename", FAST_PATH_FILENAMES)
+@pytest.mark.parametrize("media", (None, MediaType.EPISODE, MediaType.MOVIE))
+def test_fast_guess(filename: str, media: MediaType | None):
+    file_path = Path(filename)
+    options = {"type": media, "language": Language.parse("en")}
+    expected = _guessit(file_path, options)
+    actual = fast_guess(file_path, options)
+    if media and media.value != _guessit(file_path, {})["type"]:
+        assert actual is None
+    else:
+        assert actual is not None
+        assert list(actual.items()) == list(expected.items())  # order matters
+
+
+@pytest.mark.parametrize(
+    "filename",
+    (
+        "Movie.Name.2019.2160p.BluRay.x265-GRP.mkv",  # ultra hd blu-ray
+        "Movie.Name.2019-GRP.mkv",  # group without tags
+        "Movie.Name.1890.mkv",  # implausible year
+        "Movie.Name.2019.DTS.HDTV.mkv",  # unknown tag
+        "Movie.Name.2019.x264.x265.mkv",  # repeated property
+        "Movie.Name.Extended.2019.mkv",  # edition keyword
+        "Movie.Name.Remastered.2019.mkv",  # edition regular expression
+        "Movie.Name.French.2019.mkv",  # language name
+        "The.Office.US.S01E01.mkv",  # country code
+        "Series.Name.S01E01.720p-SCREENERS.mkv",  # keyword in release group
+        "X.S08E77.WEB-HDMaNiAcS.avi",  # group joined to a tag, e.g. 'WEB-HD'
+        "Series.Name.S01E01.WEB-DLGRP.mkv",
+        "Series.Name.S01E01.720p-PpvScr.mkv",  # keywords in camel cased group
+        "Series.Name.S01E01.x264-Pt10.mkv",  # digits read as a part number
+        "Season 1/Series.Name.S01E01.mkv",  # numbers in directory
+        "Pilot/Series.Name.S01E01.mkv",  # keyword in directory
+        "Series.Name.S01E01.",  # language stripped subtitle
+        "Series Name S01E01.mkv",  # not dot separated
+    ),
+)
+def test_fast_guess__unsure(filename: str):
+    assert fast_guess(Path(filename), {}) is None
+
+
+def test_fast_path_counts():
+    fast_path_counts.clear()
+    fast_guess(Path(FAST_PATH_FILENAMES[0]), {})
+    fast_guess(Path("Series Name S01E01.mkv"), {})
+    assert fast_path_counts == {"hit": 1, "miss": 1}
+
+
+@pytest.mark.parametrize(
+    "filename",
+    (
+        "Show.Name.S01E03.720p.HDTV.x264-GRP.mkv",
+        "Show.Name.S01E13.720p.HDTV.x264-GRP.mkv",
+        "Show.Name.S01E24.720p.HDTV.x264-GRP.mkv",
+    ),
+)
+def test_sibling_guess(filename: str):
+    guess(Path(SEASON_DIRECTORY, "Show.Name.S01E02.720p.HDTV.x264-GRP.mkv"), {})
+    file_path = Path(SEASON_DIRECTORY, filename)
+    with patch("mnamer.parsing.guessit") as mock_guessit:
+        raw_data = guess(file_path, {})
+    mock_guessit.assert_not_called()
+    assert list(raw_data.items()) == list(_guessit(file_path, {}).items())
+
+
+@pytest.mark.parametrize(
+    "sibling,filename",
+    (
+        # no sibling in the same folder
+        ("Other/Show.Name.S01E02.mkv", "Show.Name.S01E03.mkv"),
+        # names differ by more than their numbers
+        ("Show.Name.S01E02.720p.mkv", "Show.Name.S01E03.1080p.mkv"),
+        # season and episode numbers can't be told apart
+        ("Show.Name.S01E01.mkv", "Show.Name.S01E02.mkv"),
+        # number isn't marked as a season or episode
+        ("Show.Name.1x02.mkv", "Show.Name.2x02.mkv"),
+        ("Show.Name.S01E05.DD5.1.mkv", "Show.Name.S01E05.DD7.1.mkv"),
+        # number also appears in the folder name
+        ("Show.Name.S01E02.mkv", "Show.Name.S02E02.mkv"),
+        # new number coincides with another
+        ("Show.Name.S01E02.DD5.1.mkv", "Show.Name.S01E05.DD5.1.mkv"),
+        # number is followed by another which guessit may take as an episode
+        ("Show.Name.S09E11.5.1.mkv", "Show.Name.S09E04.5.1.mkv"),
+        ("Show.Name.S01E03.E05.mkv", "Show.Name.S01E02.E05.mkv"),
+        ("Show.Name.9x07-E05.mkv", "Show.Name.9x02-E05.mkv"),
+        ("Show.Name.1x07 & 1x09.mkv", "Show.Name.1x08 & 1x09.mkv"),
+        # zeroes and years
+        ("Show.Name.S01E02.mkv", "Show.Name.S01E00.mkv"),
+        ("Show.Name.E2018.mkv", "Show.Name.E2019.mkv"),
+    ),
+)
+def test_sibling_guess__unsure(sibling: str, filename: str):
+    guess(Path(SEASON_DIRECTORY, sibling), {})
+    assert sibling_guess(Path(SEASON_DIRECTORY, filename), {}) is None
+
+
+def test_guess_input():
+    settings = SettingStore(media=MediaType.MOVIE, language=Language.parse("fr"))
+    file_path, options = guess_input(Path("aladdin.1992.avi"), settings)
+    assert file_path == Path("aladdin.1992.avi")
+    assert options == {"type": MediaType.MOVIE, "language": Language.parse("fr")}
+
+
+def test_guess_input__subtitle():
+    file_path, options = guess_input(Path("aladdin.1992.de.srt"), SettingStore())
+    assert file_path == Path("aladdin.1992.")
+    assert options["language"] == Language.parse("de")
+
+
+def test_prefetch(parse_cache: ParseCache):
+    file_paths = [Path(filename) for filename in FILENAMES * 8]
+    settings = SettingStore()
+    assert list(prefetch(file_paths, settings, parse_cache, jobs=2)) == file_paths
+    for file_path in file_paths:
+        guess_path, options = guess_input(file_path, settings)
+        expected = guess(guess_path, options)
+        assert parse_cache.get(str(guess_path), options) == expected
+
+
+def test_prefetch__siblings(parse_cache: ParseCache):
+    file_paths = [
+        Path(SEASON_DIRECTORY, f"Show.Name.S01E{episode:02}.720p.HDTV.x264-GRP.mkv")
+        for episode in range(1, 25)
+    ]
+    settings = SettingStore()
+    assert list(prefetch(file_paths, settings, parse_cache, jobs=2)) == file_paths
+    for file_path in file_paths:
+        expected = _guessit(file_path, {"type": None, "language": None})
+        actual = parse_cache.get(str(file_path), {})
+        assert actual is not None
+        assert list(actual.items()) == list(expected.items())
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_populate_paths__jobs(setup_test_files):
+    setup_test_files(*FILENAMES)
+    settings = SettingStore(targets=[Path.cwd()])
+    expected = Target.populate_paths(settings)
+    settings.jobs = 2
+    actual = Target.populate_paths(settings)
+    assert [target.source for target in actual] == [
+        target.source for target in expected
+    ]
+    assert [target.metadata for target in actual] == [
+        target.metadata for target in expected
+    ]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_populate_paths__jobs__few_paths(setup_test_files):
+    setup_test_files(*FILENAMES[:2])
+    file_paths = [Path(filename) for filename in FILENAMES[:2]]
+    settings = SettingStore(jobs=4)
+    with patch("mnamer.target.prefetch") as mock_prefetch:
+        targets = Target.populate_paths(settings, file_paths=file_paths)
+    mock_prefetch.assert_not_called()
+    assert [target.source for target in targets] == file_paths
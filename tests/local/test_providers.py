@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+import pytest
+
+from mnamer.exceptions import MnamerNotFoundException
+from mnamer.metadata import MetadataEpisode
+from mnamer.providers import Tvdb, TvMaze
+
+pytestmark = pytest.mark.local
+
+SHOW = {"id": 123, "name": "Lost", "externals": {"thetvdb": 73739}}
+
+EPISODES = [
+    {"season": 1, "number": 1, "name": "Pilot (1)", "airdate": "2004-09-22"},
+    {"season": 1, "number": 2, "name": "Pilot (2)", "airdate": "2004-09-29"},
+    {"season": 1, "number": 3, "name": "Tabula Rasa", "airdate": "2004-10-06"},
+    {"season": 2, "number": 1, "name": "Man of Science", "airdate": "2005-09-21"},
+]
+
+
+@pytest.fixture
+def provider():
+    with (
+        patch("mnamer.providers.tvmaze_show", return_value=SHOW),
+        patch("mnamer.providers.tvmaze_show_search", return_value=[{"show": SHOW}]),
+        patch(
+            "mnamer.providers.tvmaze_show_episodes_list",
+            return_value=[{**entry, "summary": None} for entry in EPISODES],
+        ) as mock_episodes,
+    ):
+        provider = TvMaze()
+        provider.mock_episodes = mock_episodes
+        yield provider
+
+
+@pytest.mark.parametrize("id_tvmaze", (None, "123"))
+def test_search__season_pack(provider, id_tvmaze):
+    for episode, title in ((1, "Pilot (1)"), (2, "Pilot (2)"), (3, "Tabula Rasa")):
+        query = MetadataEpisode(
+            series="Lost", season=1, episode=episode, id_tvmaze=id_tvmaze
+        )
+        assert [result.title for result in provider.search(query)] == [title]
+    provider.mock_episodes.assert_called_once()
+
+
+@pytest.mark.parametrize("id_tvmaze", (None, "123"))
+def test_search__episode_range(provider, id_tvmaze):
+    query = MetadataEpisode(
+        series="Lost", season=1, episode=1, episode_last=2, id_tvmaze=id_tvmaze
+    )
+    (result,) = provider.search(query)
+    assert result.episode == 1
+    assert result.episode_last == 2
+    assert result.title == "Pilot (1) & Pilot (2)"
+    assert format(result, "S{season:02}E{episode_range}") == "S01E01-02"
+
+
+def test_search__episode_range__incomplete(provider):
+    query = MetadataEpisode(id_tvmaze="123", season=1, episode=3, episode_last=4)
+    (result,) = provider.search(query)
+    assert result.episode == 3
+    assert result.episode_last is None
+    assert result.title == "Tabula Rasa"
+
+
+def test_search__episode_range__missing(provider):
+    query = MetadataEpisode(id_tvmaze="123", season=1, episode=4, episode_last=5)
+    with pytest.raises(MnamerNotFoundException):
+        next(provider.search(query))
+
+
+def test_search__results_not_shared(provider):
+    query = MetadataEpisode(series="Lost", season=1, episode=1)
+    next(provider.search(query)).title = "Changed"
+    assert next(provider.search(query)).title == "Pilot (1)"
+
+
+def test_search__memo_cleared(provider):
+    query = MetadataEpisode(series="Lost", season=1, episode=1)
+    next(provider.search(query))
+    provider.clear_memo()
+    next(provider.search(query))
+    assert provider.mock_episodes.call_count == 2
+
+
+def test_search__memo_bounded(provider):
+    provider.memo_size = 2
+    for key in range(5):
+        provider._memoize(("key", key), lambda: None)
+    assert list(provider._responses) == [("key", 3), ("key", 4)]
+
+
+@pytest.fixture
+def tvdb():
+    entries = [
+        {
+            "firstAired": entry["airdate"],
+            "airedEpisodeNumber": entry["number"],
+            "airedSeason": entry["season"],
+            "overview": None,
+            "episodeName": entry["name"],
+        }
+        for entry in EPISODES
+    ]
+    with (
+        patch(
+            "mnamer.providers.tvdb_series_id",
+            return_value={"data": {"seriesName": "Lost"}},
+        ),
+        patch(
+            "mnamer.providers.tvdb_series_id_episodes_query",
+            return_value={"data": entries, "links": {"last": 1}},
+        ) as mock_query,
+    ):
+        provider = Tvdb()
+        provider.token = "token"
+        provider.mock_query = mock_query
+        yield provider
+
+
+def test_tvdb_search__season_pack(tvdb):
+    for episode, title in ((1, "Pilot (1)"), (2, "Pilot (2)")):
+        query = MetadataEpisode(id_tvdb="73739", season=1, episode=episode)
+        assert [result.title for result in tvdb.search(query)] == [title]
+    tvdb.mock_query.assert_called_once()
+    assert tvdb.mock_query.call_args.kwargs["episode"] is None
+
+
+def test_tvdb_search__episode_filtered(tvdb):
+    query = MetadataEpisode(id_tvdb="73739", episode=2)
+    next(tvdb.search(query))
+    assert tvdb.mock_query.call_args.kwargs["episode"] == 2
+
+
+def test_tvdb_search__episode_range(tvdb):
+    query = MetadataEpisode(id_tvdb="73739", season=1, episode=1, episode_last=2)
+    (result,) = tvdb.search(query)
+    assert result.title == "Pilot (1) & Pilot (2)"
+    assert tvdb.mock_query.call_args.kwargs["episode"] is None
@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from mnamer.scan_index import ScanIndex
+from mnamer.setting_store import SettingStore
+from mnamer.stat_cache import get_stat_cache
+from mnamer.target import Target
+from mnamer.types import ScanOutcome
+
+pytestmark = pytest.mark.local
+
+
+@pytest.fixture
+def scan_index(tmp_path: Path):
+    index = ScanIndex(tmp_path / "index.sqlite")
+    yield index
+    index.close()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_outcome_for__unknown(scan_index: ScanIndex, setup_test_files):
+    setup_test_files("a.mkv")
+    assert scan_index.outcome_for(Path("a.mkv")) is None
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_outcome_for__missing(scan_index: ScanIndex):
+    assert scan_index.outcome_for(Path("missing.mkv")) is None
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("outcome", ScanOutcome)
+def test_record(scan_index: ScanIndex, setup_test_files, outcome: ScanOutcome):
+    setup_test_files("a.mkv")
+    scan_index.record(Path("a.mkv"), outcome)
+    assert scan_index.outcome_for(Path("a.mkv")) is outcome
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_record__follows_rename(scan_index: ScanIndex, setup_test_files):
+    setup_test_files("a.mkv")
+    scan_index.record(Path("a.mkv"), ScanOutcome.MOVED)
+    Path("a.mkv").rename("b.mkv")
+    assert scan_index.outcome_for(Path("b.mkv")) is ScanOutcome.MOVED
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_record__invalidated_by_change(scan_index: ScanIndex, setup_test_files):
+    setup_test_files("a.mkv")
+    scan_index.record(Path("a.mkv"), ScanOutcome.SKIPPED)
+    Path("a.mkv").write_text("changed")
+    get_stat_cache().clear()  # lookups are cached for the duration of a run
+    assert scan_index.outcome_for(Path("a.mkv")) is None
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_record__persists(tmp_path: Path, setup_test_files):
+    setup_test_files("a.mkv")
+    index = ScanIndex(tmp_path / "index.sqlite")
+    index.record(Path("a.mkv"), ScanOutcome.SKIPPED)
+    index.close()
+    index = ScanIndex(tmp_path / "index.sqlite")
+    assert index.outcome_for(Path("a.mkv")) is ScanOutcome.SKIPPED
+    index.close()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_clear(scan_index: ScanIndex, setup_test_files):
+    setup_test_files("a.mkv")
+    scan_index.record(Path("a.mkv"), ScanOutcome.SKIPPED)
+    scan_index.clear()
+    assert scan_index.outcome_for(Path("a.mkv")) is None
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_populate_paths__skips_recorded(scan_index: ScanIndex, setup_test_files):
+    setup_test_files("aladdin.1992.avi", "kill.bill.2003.ts")
+    scan_index.record(Path("aladdin.1992.avi"), ScanOutcome.MOVED)
+    settings = SettingStore(targets=[Path(os.getcwd())])
+    targets = Target.populate_paths(settings, scan_index)
+    assert [target.source.name for target in targets] == ["kill.bill.2003.ts"]
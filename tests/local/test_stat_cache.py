@@ -0,0 +1,114 @@
+from os import scandir
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mnamer.stat_cache import StatCache, get_stat_cache
+from mnamer.utils import crawl_in
+
+pytestmark = pytest.mark.local
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_stat(setup_test_files):
+    setup_test_files("a.mkv")
+    stat_cache = StatCache()
+    assert stat_cache.stat("a.mkv").st_size == 0
+    assert stat_cache.exists("a.mkv")
+    assert stat_cache.is_file("a.mkv")
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_stat__missing():
+    stat_cache = StatCache()
+    assert stat_cache.stat("a.mkv") is None
+    assert not stat_cache.exists("a.mkv")
+    assert not stat_cache.is_file("a.mkv")
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_stat__memoized(setup_test_files):
+    setup_test_files("a.mkv")
+    stat_cache = StatCache()
+    stat_cache.stat("a.mkv")
+    Path("a.mkv").write_text("changed")
+    assert stat_cache.stat("a.mkv").st_size == 0
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_invalidate(setup_test_files):
+    setup_test_files("a.mkv")
+    stat_cache = StatCache()
+    stat_cache.stat("a.mkv")
+    Path("a.mkv").write_text("changed")
+    stat_cache.invalidate(Path("a.mkv"))
+    assert stat_cache.stat("a.mkv").st_size == 7
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_listdir(setup_test_files):
+    setup_test_files("a.mkv", "b/c.mkv")
+    stat_cache = StatCache()
+    assert stat_cache.listdir(".") == {"a.mkv", "b"}
+    assert stat_cache.listdir("b") == {"c.mkv"}
+    assert stat_cache.listdir("d") == set()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_listdir__invalidate(setup_test_files):
+    setup_test_files("a.mkv")
+    stat_cache = StatCache()
+    stat_cache.listdir(".")
+    setup_test_files("b.mkv")
+    assert stat_cache.listdir(".") == {"a.mkv"}
+    stat_cache.invalidate(Path("b.mkv"))
+    assert stat_cache.listdir(".") == {"a.mkv", "b.mkv"}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_seed(setup_test_files):
+    setup_test_files("a.mkv")
+    stat_cache = StatCache()
+    with scandir(".") as entries:
+        for entry in entries:
+            stat_cache.seed(entry)
+    with patch("mnamer.stat_cache.stat") as mock_stat:
+        assert stat_cache.is_file("./a.mkv")
+    mock_stat.assert_not_called()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_seed__from_crawl_in(setup_test_files):
+    setup_test_files("a.mkv")
+    get_stat_cache().clear()
+    (file_path,) = crawl_in([Path.cwd()])
+    with patch("mnamer.stat_cache.stat") as mock_stat:
+        assert get_stat_cache().is_file(file_path)
+    mock_stat.assert_not_called()
+
+
+def test_maxsize():
+    stat_cache = StatCache(maxsize=2)
+    for path in ("a", "b", "c"):
+        stat_cache.stat(path)
+    assert list(stat_cache._stats) == ["b", "c"]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_resolve():
+    stat_cache = StatCache()
+    assert stat_cache.resolve(Path("a.mkv")) == Path("a.mkv").resolve()
+    with patch.object(Path, "resolve") as mock_resolve:
+        stat_cache.resolve(Path("a.mkv"))
+    mock_resolve.assert_not_called()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_mkdir():
+    stat_cache = StatCache()
+    stat_cache.mkdir(Path("a", "b"))
+    assert Path("a", "b").is_dir()
+    with patch.object(Path, "mkdir") as mock_mkdir:
+        stat_cache.mkdir(Path("a", "b"))
+    mock_mkdir.assert_not_called()
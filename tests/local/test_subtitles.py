@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+
+from mnamer.subtitles import SNIFF_SIZE, sniff_language
+
+pytestmark = pytest.mark.local
+
+DIALOGUE = {
+    "ara": "ماذا تفعل هنا؟ لا أعرف. هذا ليس سهلا كما تعتقد.",
+    "dan": "Hvad laver du her? Jeg ved det ikke. Det er ikke til mig, og jeg har også travlt.",
+    "deu": "Was machst du hier? Ich weiß es nicht. Das ist der Mann, und er ist nicht allein.",
+    "eng": "What are you doing here? I know that you have the key. This is what I told you.",
+    "fas": "اینجا چه کار می کنی؟ نمی دانم. باید برویم چون آنها اینجا هستند.",
+    "fra": "Qu'est-ce que vous faites ici ? Je ne sais pas. Mais nous avons dit oui.",
+    "jpn": "ここで何をしているの？わからない。それはあなたが思うほど簡単ではありません。",
+    "rus": "Что ты здесь делаешь? Я не знаю. Это не так просто, как ты думаешь.",
+    "spa": "¿Qué estás haciendo aquí? No lo sé. Pero eso no es muy bueno para los niños.",
+    "swe": "Vad gör du här? Jag vet inte. Det är inte så lätt att förstå och jag vill inte gå.",
+    "ukr": "Що ти тут робиш? Я не знаю. Це не так просто, як ти думаєш.",
+    "zho": "你在这里做什么？我不知道。这不像你想的那么简单。",
+}
+
+
+@pytest.fixture
+def write_srt():
+    def fn(text: str, encoding: str = "utf-8", repeat: int = 4) -> Path:
+        cues = [
+            f"{idx}\n00:00:0{idx},000 --> 00:00:0{idx},900\n<i>{text}</i>\n"
+            for idx in range(1, repeat + 1)
+        ]
+        path = Path("subtitle.srt")
+        path.write_bytes("\n".join(cues).encode(encoding))
+        return path
+
+    return fn
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("language", DIALOGUE, ids=list(DIALOGUE))
+def test_sniff_language(write_srt, language):
+    assert sniff_language(write_srt(DIALOGUE[language])).a3 == language
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("encoding", ("cp1252", "utf-8-sig", "utf-16"))
+def test_sniff_language__encodings(write_srt, encoding):
+    assert sniff_language(write_srt(DIALOGUE["fra"], encoding)).a3 == "fra"
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_sniff_language__truncated(write_srt):
+    path = write_srt(DIALOGUE["rus"], repeat=100)
+    assert path.stat().st_size > SNIFF_SIZE
+    assert sniff_language(path).a3 == "rus"
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize(
+    ("text", "encoding"),
+    (
+        ("", "utf-8"),
+        ("Yes. No. Okay.", "utf-8"),
+        ("What are you doing? Je ne sais pas. Das ist nicht gut.", "utf-8"),
+        (DIALOGUE["rus"], "cp1251"),  # not decoded as cyrillic
+        ("Шта радиш овде? Ја не знам. Ђорђе је отишао кући.", "utf-8"),  # serbian
+    ),
+)
+def test_sniff_language__unsure(write_srt, text, encoding):
+    assert sniff_language(write_srt(text, encoding, repeat=2)) is None
+
+
+def test_sniff_language__missing():
+    assert sniff_language(Path("missing.srt")) is None
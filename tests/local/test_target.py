@@ -1,4 +1,5 @@
 import datetime as dt
+from copy import copy
 from pathlib import Path
 
 import pytest
@@ -53,6 +54,26 @@ def test_parse__episode():
     assert target.metadata.episode == 4
 
 
+@pytest.mark.parametrize(
+    "file_path",
+    ("ninja.turtles.s01e04e05.1080p.mp4", "ninja.turtles.s01e04-e05.1080p.mp4"),
+)
+def test_parse__episode_range(file_path):
+    target = Target(Path(file_path), SettingStore())
+    assert target.metadata.episode == 4
+    assert target.metadata.episode_last == 5
+
+
+@pytest.mark.parametrize(
+    "file_path",
+    ("ninja.turtles.s01e04.e06.1080p.mp4", "ninja.turtles.1x04 & 1x06.1080p.mp4"),
+)
+def test_parse__episode_range__gaps(file_path):
+    target = Target(Path(file_path), SettingStore())
+    assert target.metadata.episode == 4
+    assert target.metadata.episode_last is None
+
+
 def test_parse__season():
     file_path = Path("ninja.turtles.s01e04.1080p.ac3.rargb.sample.mp4")
     target = Target(file_path, SettingStore())
@@ -87,6 +108,74 @@ def test_media__override(media: MediaType):
     assert target.metadata.to_media_type() == media
 
 
+@pytest.mark.usefixtures("setup_test_dir")
+def test_nfo(setup_test_files):
+    setup_test_files("The Matrix (1999)/The Matrix (1999).mkv")
+    Path("The Matrix (1999)", "movie.nfo").write_text(
+        '<movie><uniqueid type="tmdb">603</uniqueid></movie>'
+    )
+    file_path = Path("The Matrix (1999)", "The Matrix (1999).mkv")
+    assert Target(file_path, SettingStore()).metadata.id_tmdb is None
+    target = Target(file_path, SettingStore(nfo=True))
+    assert target.metadata.id_tmdb == "603"
+    target = Target(file_path, SettingStore(nfo=True, id_tmdb="604"))
+    assert target.metadata.id_tmdb == "604"
+
+
+@pytest.mark.parametrize(
+    ("file_path", "settings"),
+    (
+        ("The Matrix (1999).mkv", {}),
+        ("Lost - S01E02 - Pilot (2).mkv", {}),
+        (
+            "Lost/Season 01/Lost.S01E02.mkv",
+            {
+                "episode_format": "{series}.S{season:02}E{episode:02}.{extension}",
+                "episode_directory": "Lost/Season {season:02}",
+            },
+        ),
+        (
+            "Lost/Lost.S01E02.mkv",
+            {
+                "episode_format": "{series}/{series}.S{season:02}E{episode:02}.{extension}",
+                "episode_directory": ".",
+            },
+        ),
+    ),
+)
+def test_is_organized(file_path, settings):
+    target = Target(Path(file_path), SettingStore(**settings))
+    assert target.is_organized()
+    assert target.destination.absolute() == target.source.absolute()
+
+
+@pytest.mark.parametrize(
+    ("file_path", "settings"),
+    (
+        ("the.matrix.1999.mkv", {}),
+        ("The Matrix (1999).mkv", {"lower": True}),
+        ("the matrix (1999).mkv", {}),
+        ("Lost - S01E02 - Pilot (2).mkv", {"replace_after": {"(": ""}}),
+        ("Lost - S1E2 - Pilot (2).mkv", {}),
+        (
+            "Lost/Lost.S01E02.mkv",
+            {"episode_format": "{series}/{series}.S{season:02}E{episode:02}"},
+        ),
+    ),
+)
+def test_is_organized__false(file_path, settings):
+    target = Target(Path(file_path), SettingStore(**settings))
+    metadata = copy(target.metadata)
+    assert not target.is_organized()
+    assert target.metadata == metadata
+
+
+def test_replace_before():
+    settings = SettingStore(replace_before={"&": "and"})
+    target = Target(Path("Penn & Teller S01E01.mkv"), settings)
+    assert target.metadata.series == "Penn and Teller"
+
+
 def test_directory__movie():
     movie_path = Path("/some/movie/path").absolute()
     target = Target(
@@ -111,6 +200,48 @@ def test_ambiguous_subtitle_language():
     assert target.metadata.language is None
 
 
+@pytest.mark.usefixtures("setup_test_dir")
+def test_sniffed_subtitle_language():
+    file_path = Path("Nancy.Drew.S01E01.srt")
+    file_path.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nWhat are you doing here?\n\n" * 10
+    )
+    target = Target(file_path, SettingStore())
+    assert target.metadata.language_sub.a2 == "en"
+    assert target.destination.name.endswith(".en.srt")
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_populate_paths__locality(setup_test_files):
+    setup_test_files(
+        "a/Lost.S02E01.mkv",
+        "a/aladdin.1992.avi",
+        "b/Fargo.S01E01.mkv",
+        "b/lost.s01e02.mkv",
+        "c/LOST.S01E01.mkv",
+    )
+    settings = SettingStore(targets=[Path.cwd()], recurse=True, locality=True)
+    targets = Target.populate_paths(settings)
+    assert [target.source.name for target in targets] == [
+        "Fargo.S01E01.mkv",
+        "lost.s01e02.mkv",
+        "LOST.S01E01.mkv",
+        "Lost.S02E01.mkv",
+        "aladdin.1992.avi",
+    ]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_populate_paths__no_locality(setup_test_files):
+    setup_test_files("b/Fargo.S01E01.mkv", "a/Lost.S02E01.mkv")
+    settings = SettingStore(targets=[Path.cwd()], recurse=True)
+    targets = Target.populate_paths(settings)
+    assert [target.source.name for target in targets] == [
+        "Lost.S02E01.mkv",
+        "Fargo.S01E01.mkv",
+    ]
+
+
 def test_destination__simple():
     pass  # TODO
 
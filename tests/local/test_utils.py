@@ -1,3 +1,5 @@
+import re
+from os import scandir
 from pathlib import Path
 from unittest.mock import patch
 
@@ -8,10 +10,12 @@ from mnamer.const import CURRENT_YEAR, SUBTITLE_CONTAINERS
 from mnamer.types import MediaType
 from mnamer.utils import (
     clean_dict,
+    compile_blacklist,
+    compile_format,
     crawl_in,
     crawl_out,
-    filter_blacklist,
-    filter_containers,
+    dedupe_paths,
+    filter_candidates,
     fn_chain,
     fn_pipe,
     format_dict,
@@ -64,7 +68,6 @@ TEST_FILES: dict[str, Path] = {
         "temp.zip",
     )
 }
-FILTER_FILENAMES = [path.absolute() for path in TEST_FILES.values()]
 FILENAME_REPLACEMENT = "The quick brown fox jumps over the lazy dog"
 
 
@@ -72,12 +75,6 @@ def paths_for(*filenames: str):
     return [path.absolute() for name, path in TEST_FILES.items() if name in filenames]
 
 
-def paths_except_for(*filenames: str):
-    return [
-        path.absolute() for name, path in TEST_FILES.items() if name not in filenames
-    ]
-
-
 # ------------------------------------------------------------------------------
 
 
@@ -160,7 +157,7 @@ def test_parse_date__dash():
 def test_dir_crawl_in__files__none():
     expected = []
     actual = crawl_in([Path(".", JUNK_TEXT)])
-    assert actual == expected
+    assert list(actual) == expected
 
 
 @pytest.mark.usefixtures("setup_test_dir")
@@ -212,6 +209,58 @@ def test_dir_crawl_in__dirs__recurse(setup_test_files):
     assert set(actual) == set(expected)
 
 
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dir_crawl_in__sort(setup_test_files):
+    setup_test_files("b.mkv", "a/z.mkv", "a/y.mkv", "c.mkv", "d/x.mkv")
+    actual = crawl_in([Path.cwd()], recurse=True, sort=True)
+    expected = [
+        Path(filename).absolute()
+        for filename in ("b.mkv", "c.mkv", "a/y.mkv", "a/z.mkv", "d/x.mkv")
+    ]
+    assert list(actual) == expected
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("workers", (2, 4, 16))
+def test_dir_crawl_in__workers(setup_test_files, workers: int):
+    setup_test_files(*TEST_FILES.keys())
+    file_paths = [Path("Downloads"), Path.cwd(), Path("aladdin.1992.avi")]
+    expected = list(crawl_in(file_paths, recurse=True, sort=True))
+    actual = crawl_in(file_paths, recurse=True, sort=True, workers=workers)
+    assert list(actual) == expected
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dir_crawl_in__lazy(setup_test_files):
+    setup_test_files("a.mkv", "b.mkv")
+    crawler = crawl_in([Path.cwd()])
+    assert next(crawler).parent == Path.cwd()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dir_crawl_in__symlinked_dirs_not_followed(setup_test_files):
+    setup_test_files("a/a.mkv")
+    Path("b").symlink_to(Path("a").absolute(), target_is_directory=True)
+    actual = crawl_in([Path.cwd()], recurse=True)
+    assert list(actual) == [Path("a", "a.mkv").absolute()]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dir_crawl_in__blacklist(setup_test_files):
+    setup_test_files("a.mkv", "a.sample.mkv", "Sample/b.mkv")
+    actual = crawl_in([Path.cwd()], recurse=True, blacklist=re.compile("sample", re.I))
+    assert list(actual) == [Path("a.mkv").absolute()]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dir_crawl_in__blacklist__prunes_directories(setup_test_files):
+    setup_test_files("a.mkv", "Extras/b.mkv", "Extras/Nested/c.mkv")
+    with patch("mnamer.utils.scandir", wraps=scandir) as mock_scandir:
+        actual = crawl_in([Path.cwd()], recurse=True, blacklist=re.compile("Extras$"))
+        assert list(actual) == [Path("a.mkv").absolute()]
+    assert mock_scandir.call_count == 1
+
+
 @pytest.mark.usefixtures("setup_test_dir")
 def test_test_crawl_out__walking(setup_test_files):
     setup_test_files(*TEST_FILES.keys())
@@ -226,6 +275,42 @@ def test_test_crawl_out__no_match():
     assert crawl_out(path) is None
 
 
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dedupe_paths__distinct(setup_test_files):
+    setup_test_files("a.mkv", "b.mkv")
+    file_paths = [Path("a.mkv"), Path("b.mkv")]
+    assert list(dedupe_paths(file_paths)) == file_paths
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dedupe_paths__repeated(setup_test_files):
+    setup_test_files("a.mkv")
+    file_paths = [Path("a.mkv").absolute(), Path("a.mkv").absolute()]
+    assert list(dedupe_paths(file_paths)) == file_paths[:1]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dedupe_paths__symlink(setup_test_files):
+    setup_test_files("a/a.mkv")
+    Path("b").symlink_to(Path("a").absolute(), target_is_directory=True)
+    file_paths = [Path("a", "a.mkv"), Path("b", "a.mkv")]
+    assert list(dedupe_paths(file_paths)) == file_paths[:1]
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_dedupe_paths__hardlink(setup_test_files):
+    setup_test_files("a.mkv")
+    Path("b.mkv").hardlink_to("a.mkv")
+    file_paths = [Path("a.mkv"), Path("b.mkv"), Path("b.mkv")]
+    assert list(dedupe_paths(file_paths)) == file_paths[:2]
+    assert list(dedupe_paths(file_paths, hardlinks=True)) == file_paths[:1]
+
+
+def test_dedupe_paths__missing():
+    file_paths = [Path(JUNK_TEXT), Path(JUNK_TEXT)]
+    assert list(dedupe_paths(file_paths)) == file_paths
+
+
 def test_str_replace__no_change():
     replacements = {}
     expected = FILENAME_REPLACEMENT
@@ -302,109 +387,79 @@ def test_str_scenify__utf8_to_ascii():
     assert actual == expected
 
 
-@pytest.mark.parametrize("sequence", ([], set(), ()))
-def test_filter_blacklist__filter_none(sequence):
-    expected = FILTER_FILENAMES
-    actual = filter_blacklist(FILTER_FILENAMES, sequence)
-    assert actual == expected
-
-
-def test_filter_blacklist__filter_multiple_paths_single_pattern():
-    expected = paths_except_for(
-        "Images/Photos/DCM0001.jpg", "Images/Photos/DCM0002.jpg"
-    )
-    actual = filter_blacklist(FILTER_FILENAMES, ["dcm"])
-    assert actual == expected
-
-
-def test_filter_blacklist__filter_multiple_paths_multiple_patterns():
-    expected = paths_except_for(
-        "temp.zip",
-        "Downloads/the.goonies.1985.sample.mp4",
-        "Sample/the mandalorian s01x02.mp4",
-    )
-    actual = filter_blacklist(FILTER_FILENAMES, ["temp", "sample"])
-    assert actual == expected
+@pytest.mark.parametrize("sequence", ([], ["", ""]))
+def test_compile_blacklist__empty(sequence):
+    assert compile_blacklist(sequence) is None
 
 
-def test_filter_blacklist__filter_single_path_single_pattern():
-    expected = paths_except_for(
-        "Images/sample.file.mp4", "Sample/the mandalorian s01x02.mp4"
-    )
-    actual = filter_blacklist(expected, ["sample"])
-    assert actual == expected
+def test_compile_blacklist__combines_patterns():
+    pattern = compile_blacklist(["^foo", "bar$"])
+    assert pattern.search("FOO baz")
+    assert pattern.search("baz BAR")
+    assert not pattern.search("baz foo bar baz")
 
 
-def test_filter_blacklist__filter_single_path_multiple_patterns():
-    expected = paths_except_for(
-        "Images/sample.file.mp4", "Sample/the mandalorian s01x02.mp4"
-    )
-    actual = filter_blacklist(expected, ["files", "sample"])
-    assert expected == actual
+@pytest.mark.parametrize(
+    ("format_spec", "name", "expected"),
+    (
+        (
+            "{name} ({year})",
+            "The Matrix (1999)",
+            {"name": "The Matrix", "year": "1999"},
+        ),
+        ("{name} ({year})", "The Matrix (99)", None),
+        (
+            "{series} - S{season:02}E{episode:02} - {title}",
+            "Lost - S01E02 - Pilot - Part 2",
+            {
+                "series": "Lost",
+                "season": "01",
+                "episode": "02",
+                "title": "Pilot - Part 2",
+            },
+        ),
+        ("{name}/{name}.{year}", "Heat/Heat.1995", {"name": "Heat", "year": "1995"}),
+        ("{name}/{name}.{year}", "Heat/Ran.1985", None),
+        ("{name} [{language[a2]}]", "Heat [en]", {"name": "Heat"}),
+    ),
+)
+def test_compile_format(format_spec, name, expected):
+    match = compile_format(format_spec).fullmatch(name)
+    assert (match and match.groupdict()) == expected
 
 
-def test_filter_blacklist__regex():
-    pattern = r"\s+"
-    expected = paths_except_for(
-        "Avengers Infinity War/Avengers.Infinity.War.srt",
-        "Avengers Infinity War/Avengers.Infinity.War.wmv",
-        "Downloads/Return of the Jedi 1080p.mkv",
-        "Ninja Turtles (1990).mkv",
-        "O.J. - Made in America S01EP03 (2016) (1080p).mp4",
-        "Planet Earth II S01E06 - Cities (2016) (2160p).mp4",
-        "Pride & Prejudice 2005.ts",
-        "Quien a hierro mata [MicroHD 1080p][DTS 5.1-Castellano-AC3 5.1-Castellano+Subs][ES-EN]/Quien a hierro mata M1080.www.pctnew.org.mkv",
-        "Sample/the mandalorian s01x02.mp4",
-        "Skiing Trip.mp4",
-        "lost s01e01-02.mp4",
-        "made up movie.mp4",
-        "made up show s01e10.mkv",
-    )
-    actual = filter_blacklist(FILTER_FILENAMES, [pattern])
-    assert actual == expected
+def test_filter_candidates__hidden():
+    file_paths = [Path("._a.mkv"), Path(".hidden", "b.mkv")]
+    actual = list(filter_candidates(file_paths, []))
+    assert actual == file_paths[1:]
 
 
-def test_filter_containers__filter_none():
-    expected = FILTER_FILENAMES
-    actual = filter_containers(FILTER_FILENAMES, [])
-    assert expected == actual
+@pytest.mark.parametrize("container", (".part", ".!qB", ".crdownload"))
+def test_filter_candidates__partial(container: str):
+    file_paths = [Path(f"a.mkv{container}"), Path("b.mkv")]
+    actual = list(filter_candidates(file_paths, []))
+    assert actual == file_paths[1:]
 
 
-@pytest.mark.parametrize("containers", (["jpg"], [".jpg"]))
-def test_filter_containers__filter_multiple_paths_single_pattern(
-    containers: list[str],
-):
-    expected = paths_for("Images/Photos/DCM0001.jpg", "Images/Photos/DCM0002.jpg")
-    actual = filter_containers(FILTER_FILENAMES, containers)
-    assert expected == actual
+@pytest.mark.parametrize("containers", (["mkv"], [".mkv"]))
+def test_filter_candidates__containers(containers: list[str]):
+    file_paths = [Path("a.mkv"), Path("b.jpg"), Path("c.MKV")]
+    actual = list(filter_candidates(file_paths, containers))
+    assert actual == [Path("a.mkv"), Path("c.MKV")]
 
 
-@pytest.mark.parametrize("containers", (["mkv", "zip"], [".mkv", ".zip"]))
-def test_filter_containers__filter_multiple_paths_multi_pattern(
-    containers: list[str],
-):
-    expected = paths_for(
-        "Desktop/temp.zip",
-        "Downloads/Return of the Jedi 1080p.mkv",
-        "Downloads/archer.2009.s10e07.webrip.x264-lucidtv.mkv",
-        "Ninja Turtles (1990).mkv",
-        "Quien a hierro mata [MicroHD 1080p][DTS 5.1-Castellano-AC3 5.1-Castellano+Subs][ES-EN]/Quien a hierro mata M1080.www.pctnew.org.mkv",
-        "made up show s01e10.mkv",
-        "s.w.a.t.2017.s02e01.mkv",
-        "temp.zip",
-    )
-    actual = filter_containers(FILTER_FILENAMES, containers)
-    assert expected == actual
+@pytest.mark.usefixtures("setup_test_dir")
+def test_filter_candidates__min_size(setup_test_files):
+    setup_test_files("small.mkv", "small.srt")
+    Path("large.mkv").write_bytes(b"0" * 10)
+    file_paths = [Path("small.mkv"), Path("small.srt"), Path("large.mkv")]
+    actual = list(filter_candidates(file_paths, [], min_size=10))
+    assert actual == file_paths[1:]
 
 
-@pytest.mark.parametrize("containers", (["mp4", "zip"], [".mp4", ".zip"]))
-def test_filter_containers__filter_single_path_multi_pattern(
-    containers: list[str],
-):
-    filepaths = paths_for("Images/Skiing Trip.mp4")
-    expected = filepaths
-    actual = filter_containers(filepaths, containers)
-    assert expected == actual
+def test_filter_candidates__min_size__missing():
+    actual = list(filter_candidates([Path(JUNK_TEXT + ".mkv")], [], min_size=1))
+    assert actual == []
 
 
 def test_fn_chain():
@@ -649,6 +704,20 @@ def test_str_fix_padding__strip_empty_brackets(s: str):
     assert actual == expected
 
 
+@pytest.mark.parametrize("s", ("(())x", "x([ ])", "x ( [] ( ) )", "[( )]x[]"))
+def test_str_fix_padding__strip_nested_empty_brackets(s: str):
+    expected = "x"
+    actual = str_fix_padding(s)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("s", ("x - ()", "- - x", " -x- - ", "x ( ) -"))
+def test_str_fix_padding__strip_uncovered_delimiters(s: str):
+    expected = "x"
+    actual = str_fix_padding(s)
+    assert actual == expected
+
+
 @pytest.mark.parametrize("s", ("-y", "y-", "--y", "-----y----"))
 def test_str_fix_padding__collapse_dashes(s: str):
     expected = "y"
@@ -805,6 +874,19 @@ def test_str_title_case__single_char():
     assert actual == expected
 
 
+def test_str_title_case__lowercase_changes_length():
+    expected = "I\u0307stanbul Ekspresi"  # 'İ' is two characters when lowercased
+    actual = str_title_case("İSTANBUL EKSPRESI")
+    assert actual == expected
+
+
+def test_str_title_case__memoized():
+    str_title_case("the fellowship of the ring")
+    hits = str_title_case.cache_info().hits
+    str_title_case("the fellowship of the ring")
+    assert str_title_case.cache_info().hits == hits + 1
+
+
 def test_year_parse__valid():
     expected = 1987
     actual = year_parse("1987")
@@ -0,0 +1,100 @@
+import re
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mnamer.exceptions import MnamerException
+from mnamer.watcher import _EVENT_HEADER, IN_Q_OVERFLOW, Watcher
+
+pytestmark = [
+    pytest.mark.local,
+    pytest.mark.skipif(sys.platform != "linux", reason="requires inotify"),
+]
+
+DEBOUNCE = 0.05
+
+
+def test_init__no_directories(tmp_path: Path):
+    (tmp_path / "a.mkv").write_text("data")
+    with pytest.raises(MnamerException):
+        Watcher([tmp_path / "a.mkv", tmp_path / "missing"])
+
+
+def test_init__no_inotify(tmp_path: Path):
+    with patch("mnamer.watcher.ctypes.CDLL", side_effect=OSError):
+        with pytest.raises(MnamerException):
+            Watcher([tmp_path])
+
+
+def test_poll__nothing_written(tmp_path: Path):
+    with Watcher([tmp_path], debounce=DEBOUNCE) as watcher:
+        assert watcher.poll(DEBOUNCE) == []
+
+
+def test_poll__closed_after_write(tmp_path: Path):
+    with Watcher([tmp_path], debounce=DEBOUNCE) as watcher:
+        (tmp_path / "a.mkv").write_text("data")
+        assert watcher.poll(1) == [tmp_path / "a.mkv"]
+
+
+def test_poll__moved_in(tmp_path: Path):
+    watched = tmp_path / "watched"
+    watched.mkdir()
+    (tmp_path / "a.mkv").write_text("data")
+    with Watcher([watched], debounce=DEBOUNCE) as watcher:
+        (tmp_path / "a.mkv").rename(watched / "a.mkv")
+        assert watcher.poll(1) == [watched / "a.mkv"]
+
+
+def test_poll__waits_for_size_to_settle(tmp_path: Path):
+    with Watcher([tmp_path], debounce=DEBOUNCE) as watcher:
+        with open(tmp_path / "a.mkv", "w") as fp:
+            fp.write("partial")
+        with open(tmp_path / "a.mkv", "a") as fp:
+            assert watcher.poll(DEBOUNCE / 2) == []
+            fp.write("remainder")
+        assert watcher.poll(1) == [tmp_path / "a.mkv"]
+
+
+def test_poll__blacklist(tmp_path: Path):
+    blacklist = re.compile("sample")
+    with Watcher([tmp_path], blacklist=blacklist, debounce=DEBOUNCE) as watcher:
+        (tmp_path / "a.sample.mkv").write_text("data")
+        assert watcher.poll(DEBOUNCE * 4) == []
+
+
+def test_poll__recurse__new_directory(tmp_path: Path):
+    with Watcher([tmp_path], recurse=True, debounce=DEBOUNCE) as watcher:
+        (tmp_path / "Season 1").mkdir()
+        assert watcher.poll(DEBOUNCE) == []
+        (tmp_path / "Season 1" / "a.mkv").write_text("data")
+        assert watcher.poll(1) == [tmp_path / "Season 1" / "a.mkv"]
+
+
+def test_poll__recurse__moved_in_directory(tmp_path: Path):
+    watched = tmp_path / "watched"
+    watched.mkdir()
+    (tmp_path / "download").mkdir()
+    (tmp_path / "download" / "a.mkv").write_text("data")
+    with Watcher([watched], recurse=True, debounce=DEBOUNCE) as watcher:
+        (tmp_path / "download").rename(watched / "download")
+        assert watcher.poll(1) == [watched / "download" / "a.mkv"]
+
+
+def test_poll__no_recurse__ignores_subdirectories(tmp_path: Path):
+    (tmp_path / "nested").mkdir()
+    with Watcher([tmp_path], debounce=DEBOUNCE) as watcher:
+        (tmp_path / "nested" / "a.mkv").write_text("data")
+        assert watcher.poll(DEBOUNCE * 4) == []
+
+
+def test_poll__overflow_rescans(tmp_path: Path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "a.mkv").write_text("data")
+    with Watcher([tmp_path], recurse=True, debounce=DEBOUNCE) as watcher:
+        overflow = _EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0)
+        with patch("mnamer.watcher.os.read", return_value=overflow):
+            watcher._read_events()
+        assert watcher.poll(1) == [tmp_path / "nested" / "a.mkv"]
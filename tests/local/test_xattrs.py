@@ -0,0 +1,134 @@
+import datetime as dt
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mnamer.language import Language
+from mnamer.metadata import MetadataEpisode, MetadataMovie
+from mnamer.setting_store import SettingStore
+from mnamer.target import Target
+from mnamer.types import ProviderType
+from mnamer.xattrs import (
+    XATTR_NAME,
+    metadata_from_xattrs,
+    metadata_to_xattrs,
+    read_xattrs,
+    write_xattrs,
+)
+
+
+def _xattrs_writable() -> bool:
+    with tempfile.NamedTemporaryFile(dir=os.getcwd()) as f:
+        return write_xattrs(f.name, {"test": "1"})
+
+
+pytestmark = [
+    pytest.mark.local,
+    pytest.mark.skipif(not _xattrs_writable(), reason="xattrs unsupported"),
+]
+
+EPISODE = MetadataEpisode(
+    series="Lost",
+    season=1,
+    episode=2,
+    title="Pilot (2)",
+    date=dt.date(2004, 9, 29),
+    container=".mkv",
+    language=Language.parse("en"),
+    id_tvdb="73739",
+)
+
+
+def test_metadata__round_trip():
+    attributes = metadata_to_xattrs(EPISODE, ProviderType.TVDB)
+    assert attributes["media"] == "episode"
+    assert attributes["provider"] == "tvdb"
+    assert attributes["date"] == "2004-09-29"
+    assert attributes["language"] == "eng"
+    assert "id_tvmaze" not in attributes
+    assert metadata_from_xattrs(attributes) == (EPISODE, ProviderType.TVDB)
+
+
+@pytest.mark.parametrize(
+    "attributes",
+    (
+        {},
+        {"media": "movie"},
+        {"media": "song", "provider": "tmdb"},
+        {"media": "episode", "provider": "tvdb", "season": "one"},
+    ),
+)
+def test_metadata__incomplete(attributes):
+    assert metadata_from_xattrs(attributes) is None
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_write__replaces(setup_test_files):
+    setup_test_files("file.mkv")
+    os.setxattr("file.mkv", "user.other", b"kept")
+    assert write_xattrs("file.mkv", {"media": "movie", "year": "1999"})
+    assert write_xattrs("file.mkv", {"media": "movie"})
+    assert read_xattrs("file.mkv") == {"media": "movie"}
+    assert os.getxattr("file.mkv", "user.other") == b"kept"
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_write__failure_removes(setup_test_files):
+    setup_test_files("file.mkv")
+    assert write_xattrs("file.mkv", {"media": "movie", "year": "1999"})
+    assert not write_xattrs("file.mkv", {"synopsis": "x" * 1024 * 1024})
+    assert read_xattrs("file.mkv") == {}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize("value", (b" ", b"{", b"[]", b'{"year": 1999}'))
+def test_read__invalid(setup_test_files, value):
+    setup_test_files("file.mkv")
+    os.setxattr("file.mkv", XATTR_NAME, value)
+    assert read_xattrs("file.mkv") == {}
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_target__restores_match(setup_test_files):
+    setup_test_files("file.mkv")
+    movie = MetadataMovie(name="The Matrix", year="1999", id_tmdb="603")
+    write_xattrs("file.mkv", metadata_to_xattrs(movie, ProviderType.TMDB))
+    with patch("mnamer.target.guess") as mock_guess:
+        target = Target(Path("file.mkv"), SettingStore(xattr=True))
+        assert target.metadata == movie
+        assert target.query() == [movie]
+    mock_guess.assert_not_called()
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+@pytest.mark.parametrize(
+    "settings",
+    (
+        {},
+        {"xattr": True, "id_tmdb": "604"},
+        {"xattr": True, "movie_api": "omdb"},
+        {"xattr": True, "media": "episode"},
+    ),
+)
+def test_target__ignores_match(setup_test_files, settings):
+    setup_test_files("file.mkv")
+    movie = MetadataMovie(name="The Matrix", year="1999", id_tmdb="603")
+    write_xattrs("file.mkv", metadata_to_xattrs(movie, ProviderType.TMDB))
+    target = Target(Path("file.mkv"), SettingStore(**settings))
+    assert target.metadata.to_media_type().value == settings.get("media", "movie")
+    assert not target._has_match
+    assert target.metadata != movie
+
+
+@pytest.mark.usefixtures("setup_test_dir")
+def test_target__relocate(setup_test_files):
+    setup_test_files("Lost.S01E02.mkv")
+    target = Target(Path("Lost.S01E02.mkv"), SettingStore(xattr=True))
+    target.metadata.update(EPISODE)
+    target.relocate()
+    restored = Target(target.destination, SettingStore(xattr=True))
+    assert restored._has_match
+    assert restored.metadata == EPISODE